@@ -0,0 +1,42 @@
+"""
+Analysis of Gun Violence Archive incidents and NICS firearm background checks.
+
+The public classes are importable from the package (e.g. `from analysis import DataCleaner`). Each
+one is loaded from its module on first access, so importing the package does not import pandas,
+the plotting libraries or the scraping libraries.
+"""
+import importlib
+
+_EXPORTS = {
+    'DataAcquisition': 'data_acquisition',
+    'DataCleaner': 'data_clean',
+    'DataTransformer': 'data_transform',
+    'ExploratoryDataAnalysis': 'exploratory',
+    'ExploratoryDataAnalysisNICS': 'exploratory',
+    'GunViolenceDataCollector': 'gvascrape',
+    'ChunkedPipeline': 'pipeline',
+    'StreamingStatistics': 'pipeline',
+    'CleaningPlan': 'plan',
+    'KLLSketch': 'sketches',
+    'ColumnSketches': 'sketches',
+    'IncidentStore': 'incident_store',
+    'NICSStore': 'nics_store',
+    'MonthlyStatePanel': 'correlation',
+    'PartitionedExecutor': 'partitioned',
+    'PlotSpec': 'report',
+    'render_report': 'report',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,236 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data_acquisition import CACHE_FORMAT, NICS_COUNT_COLUMNS
+from .incident_store import IncidentStore
+
+INCIDENT_COLUMNS = ['incidents', 'n_killed', 'n_injured']
+
+
+def month_codes(dates):
+    """
+    Codes dates as int64 months since January 1970.
+    :return: Tuple of (codes, valid) arrays; codes of missing dates are meaningless and `valid` is False.
+    """
+    values = pd.DatetimeIndex(dates).to_numpy()
+    valid = ~np.isnat(values)
+    return values.astype('datetime64[M]').astype('int64'), valid
+
+
+def _incident_frame(incidents):
+    """
+    Returns incidents in the IncidentStore layout (parsed `date`, `state`, counts) from a store, a
+    frame in that layout, or raw GunViolenceDataCollector output.
+    """
+    if isinstance(incidents, IncidentStore):
+        return incidents.df if incidents.df is not None else pd.DataFrame(columns=['date', 'state'])
+    if 'Incident Date' in incidents.columns:
+        store = IncidentStore()
+        store.insert(incidents)
+        return store.df
+    return incidents
+
+
+def _column_means(values, valid):
+    counts = np.maximum(valid.sum(axis=0), 1)
+    return np.where(valid, values, 0.0).sum(axis=0) / counts
+
+
+def _pearson(x, y):
+    """
+    Pearson correlations of every column of x (n x p) with every column of y (n x q), over the rows
+    where both values are present (pairwise complete), from a handful of matrix products.
+    :return: p x q array; NaN where fewer than two rows are shared or a column is constant.
+    """
+    x_valid, y_valid = ~np.isnan(x), ~np.isnan(y)
+    # Centering on the column means does not change r but keeps the sums of squares small.
+    x = np.where(x_valid, x - _column_means(x, x_valid), 0.0)
+    y = np.where(y_valid, y - _column_means(y, y_valid), 0.0)
+    x_mask, y_mask = x_valid.astype(float), y_valid.astype(float)
+    n = x_mask.T @ y_mask
+    sum_x, sum_y = x.T @ y_mask, x_mask.T @ y
+    sum_xx, sum_yy = (x * x).T @ y_mask, x_mask.T @ (y * y)
+    sum_xy = x.T @ y
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = n * sum_xy - sum_x * sum_y
+        scale = np.sqrt((n * sum_xx - sum_x ** 2) * (n * sum_yy - sum_y ** 2))
+        r = np.where((n > 1) & (scale > 0), covariance / scale, np.nan)
+    return np.clip(r, -1.0, 1.0)
+
+
+class MonthlyStatePanel:
+    """
+    NICS background checks and Gun Violence Archive incidents joined on (month, state).
+
+    build() codes both datasets onto the same integer keys: months since 1970 and positions in the
+    list of NICS states. Incidents are aggregated onto the dense month x state grid with one
+    np.bincount per measure (incident count, killed, injured), which is a direct-address hash join,
+    and the NICS rows are scattered onto the same grid. The panel covers the NICS (month, state)
+    cells between the first and the last incident month; a cell without incidents counts as zero.
+    Incidents in states that NICS does not report are dropped.
+
+    The grids are kept in memory, so correlations() and cross_correlations() are a few matrix
+    products over every NICS column at once, and their results are memoized. save() and open()
+    persist the panel so that it does not have to be rebuilt from the raw data.
+
+    Example:
+        panel = MonthlyStatePanel.build(nics_df, IncidentStore.open('incidents'))
+        panel.correlations(within_state=True)
+        panel.cross_correlations(max_lag=6)['incidents'].unstack('lag')
+    """
+    def __init__(self, panel, nics_columns, incident_columns):
+        """
+        :param panel: DataFrame indexed by (date, state), as returned by the `panel` attribute.
+        :param nics_columns: NICS count columns of the panel.
+        :param incident_columns: Incident measures of the panel.
+        """
+        self.panel = panel
+        self.nics_columns = list(nics_columns)
+        self.incident_columns = list(incident_columns)
+        self.path = None
+        self._results = {}
+        dates = panel.index.get_level_values('date')
+        states = panel.index.get_level_values('state')
+        self.months = pd.DatetimeIndex(sorted(dates.unique()))
+        self.states = pd.Index(sorted(states.unique()))
+        rows = self.months.get_indexer(dates)
+        columns = self.states.get_indexer(states)
+        self._grids = {}
+        for name, names in (('nics', self.nics_columns), ('incidents', self.incident_columns)):
+            grid = np.full((len(self.months), len(self.states), len(names)), np.nan)
+            grid[rows, columns] = panel[names].to_numpy(dtype=float, na_value=np.nan)
+            self._grids[name] = grid
+
+    @classmethod
+    def build(cls, nics, incidents, columns=None, date_column=None):
+        """
+        Builds the panel from NICS rows and incidents.
+        :param nics: DataFrame of NICS rows with a datetime `month` (as loaded by DataAcquisition) or
+            `date` (as prepared by NICSStore) column and a `state` column.
+        :param incidents: IncidentStore, DataFrame in its layout, or raw GunViolenceDataCollector output.
+        :param columns: NICS count columns to include. If None, every NICS count column present.
+        :param date_column: Name of the NICS date column; detected if None.
+        :return: MonthlyStatePanel.
+        """
+        if date_column is None:
+            date_column = 'month' if 'month' in nics.columns else 'date'
+        if columns is None:
+            columns = [column for column in NICS_COUNT_COLUMNS if column in nics.columns]
+        incidents = _incident_frame(incidents)
+        incident_columns = ['incidents'] + [column for column in INCIDENT_COLUMNS[1:] if column in incidents.columns]
+
+        nics_months, nics_valid = month_codes(nics[date_column])
+        state_codes, states = pd.factorize(nics['state'].astype(str), sort=True)
+        incident_months, incident_valid = month_codes(incidents['date'])
+        incident_states = states.get_indexer(incidents['state'].astype(str))
+        incident_valid &= incident_states >= 0
+        if not incident_valid.any():
+            raise ValueError("No incidents fall in a state reported by NICS.")
+        first, last = incident_months[incident_valid].min(), incident_months[incident_valid].max()
+        n_months, n_states = last - first + 1, len(states)
+
+        def cell(months, state_positions, valid):
+            valid = valid & (months >= first) & (months <= last)
+            return (months - first) * n_states + state_positions, valid
+
+        nics_cells, nics_valid = cell(nics_months, state_codes, nics_valid & (state_codes >= 0))
+        incident_cells, incident_valid = cell(incident_months, incident_states, incident_valid)
+        size = n_months * n_states
+
+        data = {}
+        for column in columns:
+            values = nics[column].to_numpy(dtype=float, na_value=np.nan)
+            valid = nics_valid & ~np.isnan(values)
+            sums = np.bincount(nics_cells[valid], values[valid], minlength=size)
+            reported = np.bincount(nics_cells[valid], minlength=size)
+            data[column] = np.where(reported > 0, sums, np.nan)
+        for column in incident_columns:
+            weights = None
+            if column != 'incidents':
+                weights = pd.to_numeric(incidents[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                weights = np.nan_to_num(weights[incident_valid])
+            data[column] = np.bincount(incident_cells[incident_valid], weights, minlength=size).astype(float)
+
+        present = np.bincount(nics_cells[nics_valid], minlength=size) > 0
+        cells = np.flatnonzero(present)
+        dates = (first + cells // n_states).astype('datetime64[M]').astype('datetime64[ns]')
+        index = pd.MultiIndex.from_arrays([pd.DatetimeIndex(dates), states[cells % n_states]], names=['date', 'state'])
+        panel = pd.DataFrame({column: values[cells] for column, values in data.items()}, index=index)
+        return cls(panel, columns, incident_columns)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Opens a panel saved with save().
+        """
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as handle:
+            meta = json.load(handle)
+        data_path = os.path.join(path, f"panel.{meta['format']}")
+        panel = pd.read_parquet(data_path) if meta['format'] == 'parquet' else pd.read_pickle(data_path)
+        result = cls(panel, meta['nics_columns'], meta['incident_columns'])
+        result.path = path
+        return result
+
+    def save(self, path=None):
+        """
+        Writes the panel to `path` (default: the path it was opened from).
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("MonthlyStatePanel.save needs a path.")
+        os.makedirs(path, exist_ok=True)
+        data_path = os.path.join(path, f'panel.{CACHE_FORMAT}')
+        if CACHE_FORMAT == 'parquet':
+            self.panel.to_parquet(data_path)
+        else:
+            self.panel.to_pickle(data_path)
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as handle:
+            json.dump({'format': CACHE_FORMAT, 'nics_columns': self.nics_columns,
+                       'incident_columns': self.incident_columns, 'rows': len(self.panel)}, handle)
+        self.path = path
+
+    def _grid(self, name, all_columns, columns, within_state):
+        grid = self._grids[name][:, :, [all_columns.index(column) for column in columns]]
+        if within_state:
+            valid = ~np.isnan(grid)
+            counts = np.maximum(valid.sum(axis=0, keepdims=True), 1)
+            grid = grid - np.where(valid, grid, 0.0).sum(axis=0, keepdims=True) / counts
+        return grid
+
+    def cross_correlations(self, max_lag=12, columns=None, incident_columns=None, within_state=False):
+        """
+        Correlates every NICS column at month t with every incident measure at month t + lag, within
+        the same state, for every lag from -max_lag to max_lag.
+        :param max_lag: int, largest lag in months. Positive lags pair background checks with later incidents.
+        :param columns: NICS columns to include (default: all of the panel).
+        :param incident_columns: Incident measures to include (default: all of the panel).
+        :param within_state: bool, whether to subtract every state's mean first, so that correlations
+            reflect changes over time within states rather than differences in size between states.
+        :return: DataFrame indexed by (lag, NICS column) with one column per incident measure.
+        """
+        columns = list(columns or self.nics_columns)
+        incident_columns = list(incident_columns or self.incident_columns)
+        key = (max_lag, tuple(columns), tuple(incident_columns), within_state)
+        if key not in self._results:
+            nics = self._grid('nics', self.nics_columns, columns, within_state)
+            incidents = self._grid('incidents', self.incident_columns, incident_columns, within_state)
+            n_months = len(self.months)
+            lags = range(-max_lag, max_lag + 1)
+            blocks = []
+            for lag in lags:
+                x = nics[max(0, -lag):n_months - max(0, lag)]
+                y = incidents[max(0, lag):n_months - max(0, -lag)]
+                blocks.append(_pearson(x.reshape(-1, len(columns)), y.reshape(-1, len(incident_columns))))
+            index = pd.MultiIndex.from_product([lags, columns], names=['lag', 'column'])
+            self._results[key] = pd.DataFrame(np.concatenate(blocks), index=index, columns=incident_columns)
+        return self._results[key]
+
+    def correlations(self, columns=None, incident_columns=None, within_state=False):
+        """
+        Correlates every NICS column with every incident measure over the (month, state) cells.
+        :return: DataFrame with one row per NICS column and one column per incident measure.
+        """
+        return self.cross_correlations(0, columns, incident_columns, within_state).loc[0]
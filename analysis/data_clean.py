@@ -1,5 +1,12 @@
+import warnings
+
+import numpy as np
 import pandas as pd
 
+from .profiling import profile_methods
+from .sketches import ColumnSketches
+
+@profile_methods
 class DataCleaner:
     def __init__(self, dataframe):
         """
@@ -8,35 +15,68 @@ class DataCleaner:
         """
         self.df = dataframe
 
-    def remove_duplicates(self):
+    def remove_duplicates(self, subset=None, hash_keys=False):
         """
-        Removes duplicate rows from the DataFrame.
+        Removes duplicate rows from the DataFrame, in place with either method.
+        :param subset: Optional list of key columns; rows with equal values in these columns are duplicates.
+        :param hash_keys: If True, rows are compared through a single 64-bit hash of the key columns
+            instead of pandas' column-by-column factorization, which is faster for wide keys. Two
+            different rows whose hashes collide are treated as duplicates; the chance of any collision
+            among n distinct rows is about n**2 / 2**65 (roughly 3e-8 for a million rows, 3e-4 for 100M).
         """
-        self.df.drop_duplicates(inplace=True)
+        if hash_keys:
+            keys = self.df if subset is None else self.df[subset]
+            duplicated = pd.util.hash_pandas_object(keys, index=False).duplicated().to_numpy()
+            if duplicated.any():
+                # Drop by position through a temporary RangeIndex, so that duplicate index labels are
+                # handled, then restore the labels of the kept rows.
+                index = self.df.index
+                self.df.reset_index(drop=True, inplace=True)
+                self.df.drop(index=np.flatnonzero(duplicated), inplace=True)
+                self.df.index = index[~duplicated]
+        else:
+            self.df.drop_duplicates(subset=subset, inplace=True)
         return self.df
 
-    def handle_missing_values(self, strategy='mean', specific_column=None, custom_fill_value=None):
+    def handle_missing_values(self, strategy='mean', specific_column=None, custom_fill_value=None, fill_values=None):
         """
         Handles missing values in the DataFrame.
         :param strategy: Strategy to handle missing values ('mean', 'median', 'drop', 'custom', etc.)
         :param specific_column: Specifies a column to apply the missing value strategy. If None, applies to all columns.
         :param custom_fill_value: Custom value to fill missing data if strategy is 'custom'.
+        :param fill_values: Optional dict of precomputed mean/median fill values per column, e.g. global
+            statistics when the DataFrame is only one chunk of a larger dataset.
         """
-        columns = [specific_column] if specific_column else self.df.columns
+        columns = [specific_column] if specific_column else list(self.df.columns)
 
-        for col in columns:
-            if self.df[col].dtype.kind in 'biufc' and strategy in ['mean', 'median']:  # Numerical columns
-                if strategy == 'mean':
-                    self.df[col].fillna(self.df[col].mean(), inplace=True)
-                elif strategy == 'median':
-                    self.df[col].fillna(self.df[col].median(), inplace=True)
-            elif strategy == 'drop':
-                self.df.dropna(subset=[col], inplace=True)
-            elif strategy == 'custom':
-                self.df[col].fillna(custom_fill_value, inplace=True)
+        if strategy in ['mean', 'median', 'custom']:
+            self.df.fillna(self._fills(strategy, columns, custom_fill_value, fill_values), inplace=True)
+        elif strategy == 'drop':
+            self.df.dropna(subset=columns, inplace=True)
 
         return self.df
 
+    def _fills(self, strategy, columns, custom_fill_value=None, fill_values=None):
+        """
+        Returns the column -> value mapping that handle_missing_values fills `columns` with.
+        """
+        if strategy == 'custom':
+            return {column: custom_fill_value for column in columns}
+        numeric = [column for column in columns if self.df[column].dtype.kind in 'biufc']  # Numerical columns
+        fills = pd.Series(fill_values, dtype=float).reindex(numeric) if fill_values is not None else None
+        missing = numeric if fills is None else fills.index[fills.isna()].tolist()
+        if missing:
+            # A single frame-level reduction runs block by block instead of column by column.
+            computed = self.df[missing].mean() if strategy == 'mean' else self.df[missing].median()
+            fills = computed.astype(float) if fills is None else fills.fillna(computed.astype(float))
+        if fills is None:
+            return {}
+        fills = fills.dropna()
+        # Keep (nullable) integer columns integer instead of upcasting them to float.
+        integer = [column for column in fills.index if self.df[column].dtype.kind in 'iu']
+        fills[integer] = fills[integer].round()
+        return fills.to_dict()
+
     def convert_data_types(self, column, new_type):
         """
         Converts the data type of a specified column.
@@ -46,17 +86,87 @@ class DataCleaner:
         self.df[column] = self.df[column].astype(new_type)
         return self.df
 
-    def check_for_outliers(self, column):
+    def numeric_columns(self):
+        return [column for column in self.df.columns if self.df[column].dtype.kind in 'biufc']
+
+    def numeric_statistics(self, quantiles=(0.25, 0.5, 0.75), columns=None, approximate=False, k=200):
+        """
+        Computes count, mean and quantiles of all numeric columns at once.
+        :param quantiles: Quantiles to compute.
+        :param columns: Columns to include. Non-numeric columns are skipped. If None, all numeric columns.
+        :param approximate: If True, quantiles come from mergeable KLL sketches (see sketches.KLLSketch
+            for the error bounds) instead of an exact sort.
+        :param k: Accuracy parameter of the sketches when approximate is True.
+        :return: DataFrame indexed by column with 'count', 'mean' and one column per quantile.
+        """
+        numeric = self.numeric_columns()
+        columns = numeric if columns is None else [column for column in columns if column in numeric]
+        if approximate:
+            return ColumnSketches(columns, k).update(self.df).statistics(quantiles)
+        statistics = pd.DataFrame(index=pd.Index(columns, dtype=object), columns=['count', 'mean', *quantiles], dtype=float)
+        groups = {}
+        for column in columns:
+            groups.setdefault(self.df[column].dtype, []).append(column)
+        # One vectorised pass per dtype group, so only one group is held as a float block at a time.
+        for group in groups.values():
+            values = self.df[group].to_numpy(dtype=float, na_value=np.nan)
+            counts = (~np.isnan(values)).sum(axis=0)
+            statistics.loc[group, 'count'] = counts
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                statistics.loc[group, 'mean'] = np.nansum(values, axis=0) / counts
+                if quantiles and len(values):
+                    statistics.loc[group, list(quantiles)] = np.nanquantile(values, list(quantiles), axis=0).T
+        return statistics
+
+    def outlier_mask(self, columns=None, approximate=False, k=200):
+        """
+        Flags IQR outliers in several numeric columns with a single statistics pass.
+        :param columns: Columns to check. If None, all numeric columns.
+        :param approximate: If True, the quartiles come from KLL sketches.
+        :param k: Accuracy parameter of the sketches when approximate is True.
+        :return: Boolean DataFrame, True where a value lies outside its column's fences.
+        """
+        statistics = self.numeric_statistics((0.25, 0.75), columns, approximate, k)
+        iqr = statistics[0.75] - statistics[0.25]
+        lower, upper = statistics[0.25] - 1.5 * iqr, statistics[0.75] + 1.5 * iqr
+        values = self.df[statistics.index].to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            mask = (values < lower.to_numpy()) | (values > upper.to_numpy())
+        return pd.DataFrame(mask, index=self.df.index, columns=statistics.index)
+
+    def outlier_bounds(self, column, quartiles=None):
+        """
+        Computes the IQR outlier fences of a column.
+        :param column: Column to compute the fences for.
+        :param quartiles: Optional precomputed (q1, q3), e.g. from streaming statistics over the whole dataset.
+        :return: Tuple of (lower, upper) bounds; values outside them are outliers.
+        """
+        if quartiles is None:
+            quartiles = self.df[column].quantile(0.25), self.df[column].quantile(0.75)
+        q1, q3 = quartiles
+        iqr = q3 - q1
+        return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    def outlier_flags(self, column, bounds=None):
+        """
+        Marks the values of a column outside the IQR fences.
+        :param column: Column to be checked for outliers.
+        :param bounds: Optional precomputed (lower, upper) fences, e.g. from the whole dataset when the DataFrame is a chunk.
+        :return: Boolean Series, False for missing values.
+        """
+        lower, upper = bounds if bounds is not None else self.outlier_bounds(column)
+        outlier_condition = (self.df[column] < lower) | (self.df[column] > upper)
+        return outlier_condition.fillna(False).astype(bool)
+
+    def check_for_outliers(self, column, bounds=None):
         """
         Identifies outliers in a specified column.
         :param column: Column to be checked for outliers.
+        :param bounds: Optional precomputed (lower, upper) fences, e.g. from the whole dataset when the DataFrame is a chunk.
         :return: DataFrame with identified outliers.
         """
-        q1 = self.df[column].quantile(0.25)
-        q3 = self.df[column].quantile(0.75)
-        iqr = q3 - q1
-        outlier_condition = (self.df[column] < (q1 - 1.5 * iqr)) | (self.df[column] > (q3 + 1.5 * iqr))
-        return self.df[outlier_condition]
+        return self.df[self.outlier_flags(column, bounds)]
 
     def standardize_categorical(self, column):
         """
@@ -78,4 +188,4 @@ class DataCleaner:
             self.df = pd.concat([self.df, dummies], axis=1)
         elif method == 'label':
             self.df[column] = self.df[column].astype('category').cat.codes
-        return self.df
\ No newline at end of file
+        return self.df
\ No newline at end of file
@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
 
+from .profiling import profile_methods
+
+@profile_methods
 class DataTransformer:
     def __init__(self, dataframe):
         """
@@ -8,17 +12,41 @@ class DataTransformer:
         """
         self.df = dataframe
 
-    def extract_date_components(self, date_column, drop_original=True):
+    @staticmethod
+    def _component(values, codes, dtype):
+        """
+        Expands a component computed on the unique dates back to one value per row.
+        Rows with a missing date (code -1) become <NA>.
+        """
+        if (codes < 0).any():
+            return pd.array(values, dtype=dtype.capitalize()).take(codes, allow_fill=True)
+        return values.astype(dtype).take(codes)
+
+    def extract_date_components(self, date_column, drop_original=True, date_format=None, cache=True):
         """
         Extracts components from a date column (year, month, day).
         :param date_column: The name of the column containing date information.
         :param drop_original: Boolean, whether to drop the original date column after extraction.
+            If False, the column is kept, converted to datetime.
+        :param date_format: Optional strftime format of the dates (e.g. '%Y-%m' for the NICS `month`
+            column or '%B %d, %Y' for GVA incident dates). Skips per-element format inference.
+        :param cache: Boolean, whether to parse and split each distinct date only once. Date columns
+            usually repeat a small set of values (about 300 months for the 13k NICS rows).
         """
-        self.df[date_column] = pd.to_datetime(self.df[date_column])
-        self.df[date_column + '_year'] = self.df[date_column].dt.year
-        self.df[date_column + '_month'] = self.df[date_column].dt.month
-        self.df[date_column + '_day'] = self.df[date_column].dt.day
+        column = self.df[date_column]
+        if cache:
+            codes, uniques = pd.factorize(column)
+            dates = pd.DatetimeIndex(pd.to_datetime(uniques, format=date_format))
+        else:
+            dates = pd.DatetimeIndex(pd.to_datetime(column, format=date_format))
+            codes = np.where(dates.isna(), -1, np.arange(len(dates)))
+
+        self.df[date_column + '_year'] = self._component(dates.year.to_numpy(), codes, 'int16')
+        self.df[date_column + '_month'] = self._component(dates.month.to_numpy(), codes, 'int8')
+        self.df[date_column + '_day'] = self._component(dates.day.to_numpy(), codes, 'int8')
 
-        # if drop_original:
-        #     self.df.drop(columns=[date_column], inplace=True)
+        if drop_original:
+            self.df.drop(columns=[date_column], inplace=True)
+        else:
+            self.df[date_column] = dates.take(codes, allow_fill=True, fill_value=pd.NaT)
         return self.df
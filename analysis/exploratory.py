@@ -1,18 +1,261 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from pandas.plotting import parallel_coordinates
 from math import pi
-from scipy import stats
-from scipy.stats import shapiro
 
+from .lazy_imports import LazyModule
+from .profiling import profile_methods
+
+# Plotting and test libraries are imported on first use, so loading the data classes stays cheap.
+plt = LazyModule('matplotlib.pyplot')
+sns = LazyModule('seaborn')
+stats = LazyModule('scipy.stats')
+
+
+def _resolve_axes(ax, figsize=None, **subplot_kw):
+    """
+    Returns (axes, show). Without an explicit Axes the plot goes to the current pyplot figure (a new
+    one when a figsize is given) and is shown when finished, as before; with one, nothing global is
+    touched and the caller owns the figure.
+    """
+    if ax is not None:
+        return ax, False
+    if figsize is not None:
+        plt.figure(figsize=figsize)
+    return (plt.subplot(111, **subplot_kw) if subplot_kw else plt.gca()), True
+
+
+def _finish(ax, show):
+    if show:
+        plt.show()
+    return ax
+
+
+def stratified_sample(dataframe, size, by=None, random_state=0):
+    """
+    Draws about `size` rows without replacement. With `by`, every group keeps its share of the rows
+    (and at least one row), so small classes stay visible; without it the sample is uniform.
+    :return: DataFrame of sampled rows, in their original order.
+    """
+    if len(dataframe) <= size:
+        return dataframe
+    if by is None:
+        return dataframe.sample(n=size, random_state=random_state).sort_index()
+    fraction = size / len(dataframe)
+    rng = np.random.default_rng(random_state)
+    positions = []
+    for group_positions in dataframe.groupby(by, observed=True, sort=False).indices.values():
+        keep = max(1, int(round(len(group_positions) * fraction)))
+        positions.append(rng.choice(group_positions, size=keep, replace=False))
+    return dataframe.iloc[np.sort(np.concatenate(positions))]
+
+
+def binned_kde(values, bins=2048, bandwidth=None):
+    """
+    Gaussian kernel density estimate computed on a histogram with an FFT convolution, in
+    O(n + bins log bins) instead of the O(n * grid) of an exact KDE.
+    :param values: array-like of numbers; NaNs are ignored.
+    :param bins: int, number of grid points.
+    :param bandwidth: float, kernel standard deviation. Defaults to Scott's rule, as in seaborn; 1.0
+        when that is undefined or zero (a single value or all values equal).
+    :return: Tuple of (grid, density) arrays, both empty when there are no finite values.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.empty(0), np.empty(0)
+    if bandwidth is None:
+        bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5) if len(values) > 1 else np.nan
+    if not np.isfinite(bandwidth) or bandwidth <= 0:
+        bandwidth = 1.0
+    low, high = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=bins, range=(low, high))
+    grid = (edges[:-1] + edges[1:]) / 2
+    step = edges[1] - edges[0]
+    offsets = np.arange(-bins, bins + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    size = len(counts) + len(kernel) - 1
+    smoothed = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    density = smoothed[bins:bins + len(counts)] / len(values)
+    return grid, np.clip(density, 0, None)
+
+
+STATISTICS = ['count', 'mean', 'median', 'mode', 'std', 'var', 'skew', 'kurtosis']
+
+
+def _group_codes(dataframe, by):
+    if by is None:
+        return np.zeros(len(dataframe), dtype=np.intp), pd.Index(['all'])
+    codes, groups = pd.factorize(dataframe[by], sort=True)
+    return codes, pd.Index(groups, name=by)
+
+
+def describe_columns(dataframe, columns=None, by=None, ddof=0):
+    """
+    Computes count, mean, median, mode, std, var, skew and kurtosis of many numeric columns at once.
+
+    The columns are stacked into one float matrix and sorted once per column by (group, value), so
+    every statistic of every column and group comes from a few vectorised NumPy reductions instead
+    of one pass per column and statistic. Missing values are ignored.
+
+    :param dataframe: DataFrame to describe.
+    :param columns: Numeric columns to include. If None, all numeric columns (except `by`).
+    :param by: Optional column to group by, e.g. 'state'. Rows with a missing group are ignored.
+    :param ddof: Delta degrees of freedom of std and var; 0 matches np.std/np.var.
+    :return: Tidy DataFrame with one row per column (per (group, column) with `by`) and one column per
+        statistic. Skew and kurtosis are the biased Fisher estimates of scipy.stats.skew/kurtosis; the
+        mode is the smallest of the most frequent values.
+    """
+    if columns is None:
+        columns = [column for column in dataframe.columns
+                   if column != by and dataframe[column].dtype.kind in 'biufc']
+    columns = list(columns)
+    codes, groups = _group_codes(dataframe, by)
+    values = dataframe[columns].to_numpy(dtype=float, na_value=np.nan).T
+    present = codes >= 0
+    values, codes = values[:, present], codes[present]
+    if values.shape[1] == 0:
+        # No rows (or none with a group): np.add.reduceat cannot reduce an empty axis. Groups come
+        # from the rows that are present, so otherwise every group has at least one row.
+        count = np.zeros((len(columns), len(groups)), dtype=np.int64)
+        empty = np.full(count.shape, np.nan)
+        return _statistics_frame({name: count if name == 'count' else empty for name in STATISTICS}, columns, groups, by)
+
+    # Sort every column by (group, value); NaNs go to the end of their group.
+    order = np.lexsort((values, np.broadcast_to(codes, values.shape)))
+    values = np.take_along_axis(values, order, axis=1)
+    sorted_codes = np.sort(codes)
+    sizes = np.bincount(sorted_codes, minlength=len(groups))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    valid = ~np.isnan(values)
+    count = np.add.reduceat(valid, starts, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=1) / count
+        centered = np.where(valid, values - np.repeat(mean, sizes, axis=1), 0.0)
+        squared = centered ** 2
+        m2 = np.add.reduceat(squared, starts, axis=1) / count
+        m3 = np.add.reduceat(squared * centered, starts, axis=1) / count
+        m4 = np.add.reduceat(squared * squared, starts, axis=1) / count
+        var = m2 * count / (count - ddof)
+        skew = np.where(m2 > 0, m3 / m2 ** 1.5, np.nan)
+        kurtosis = np.where(m2 > 0, m4 / m2 ** 2 - 3.0, np.nan)
+
+    # The valid values of a group are its first `count` sorted entries.
+    last = np.maximum(count - 1, 0)
+    lower = np.take_along_axis(values, starts + last // 2, axis=1)
+    upper = np.take_along_axis(values, starts + (last + 1) // 2, axis=1)
+    median = np.where(count > 0, (lower + upper) / 2, np.nan)
+
+    # Mode: the longest run of equal values within each (column, group) segment.
+    n_columns, n_rows = values.shape
+    flat = values.ravel()
+    boundary = np.zeros(n_rows, dtype=bool)
+    boundary[starts[sizes > 0]] = True
+    new_run = np.tile(boundary, n_columns)
+    new_run[1:] |= flat[1:] != flat[:-1]
+    run_starts = np.flatnonzero(new_run)
+    run_lengths = np.diff(np.append(run_starts, flat.size))
+    run_values = flat[run_starts]
+    run_lengths[np.isnan(run_values)] = 0
+    run_keys = (run_starts // n_rows) * len(groups) + sorted_codes[run_starts % n_rows]
+    best = np.lexsort((-run_lengths, run_keys))
+    keys, first = np.unique(run_keys[best], return_index=True)
+    mode = np.full(n_columns * len(groups), np.nan)
+    mode[keys] = np.where(run_lengths[best[first]] > 0, run_values[best[first]], np.nan)
+    mode = mode.reshape(n_columns, len(groups))
+
+    table = {'count': count, 'mean': mean, 'median': median, 'mode': mode, 'std': np.sqrt(var),
+             'var': var, 'skew': skew, 'kurtosis': kurtosis}
+    return _statistics_frame(table, columns, groups, by)
+
+
+def _statistics_frame(table, columns, groups, by):
+    """
+    Lays out (column x group) statistic arrays as the tidy frame returned by describe_columns.
+    """
+    if by is None:
+        return pd.DataFrame({name: statistic[:, 0] for name, statistic in table.items()},
+                            index=pd.Index(columns, name='column'))
+    index = pd.MultiIndex.from_product([groups, columns], names=[by, 'column'])
+    return pd.DataFrame({name: statistic.T.ravel() for name, statistic in table.items()}, index=index)
+
+
+def normality_tests(dataframe, columns=None, by=None, max_shapiro=5000, large_test='normaltest',
+                    alpha=0.05, random_state=0):
+    """
+    Tests many numeric columns for normality.
+
+    The Shapiro-Wilk p-value is only accurate up to 5000 observations, so larger samples either
+    switch to the D'Agostino-Pearson test (large_test='normaltest'), which is built on skew and
+    kurtosis and scales to any size, or run Shapiro-Wilk on a random subsample of `max_shapiro`
+    values (large_test='subsample').
+
+    :param columns: Numeric columns to test. If None, all numeric columns (except `by`).
+    :param by: Optional column to group by, e.g. 'state'.
+    :return: Tidy DataFrame with one row per column (per (group, column) with `by`) holding the test
+        used, the number of values tested, the statistic, the p-value and whether normality is
+        rejected at `alpha`. Samples too small to test get no test and NaN results.
+    """
+    if large_test not in ('normaltest', 'subsample'):
+        raise ValueError("large_test must be 'normaltest' or 'subsample'")
+    if columns is None:
+        columns = [column for column in dataframe.columns
+                   if column != by and dataframe[column].dtype.kind in 'biufc']
+    columns = list(columns)
+    codes, groups = _group_codes(dataframe, by)
+    values = dataframe[columns].to_numpy(dtype=float, na_value=np.nan)
+    rng = np.random.default_rng(random_state)
+    positions = pd.Series(np.arange(len(codes))).groupby(codes).indices
+
+    rows = []
+    for code, group in enumerate(groups):
+        group_values = values[positions.get(code, [])]
+        for index, column in enumerate(columns):
+            data = group_values[:, index]
+            data = data[~np.isnan(data)]
+            test, statistic, p_value = None, np.nan, np.nan
+            if len(data) > max_shapiro and large_test == 'subsample':
+                data = rng.choice(data, size=max_shapiro, replace=False)
+            if len(data) > max_shapiro:
+                test = 'normaltest'
+                statistic, p_value = stats.normaltest(data)
+            elif len(data) >= 3 and np.ptp(data) > 0:
+                test = 'shapiro'
+                statistic, p_value = stats.shapiro(data)
+            rows.append((group, column, test, len(data), statistic, p_value))
+
+    result = pd.DataFrame(rows, columns=[by or 'group', 'column', 'test', 'n', 'statistic', 'p_value'])
+    result['normal_rejected'] = result['p_value'] < alpha
+    if by is None:
+        return result.drop(columns='group').set_index('column')
+    return result.set_index([by, 'column'])
+
+
+def _size_note(strategy, used, total):
+    if used >= total:
+        return f' [{strategy}, all {total:,} rows]'
+    return f' [{strategy}, {used:,} of {total:,} rows ({used / total:.1%})]'
+
+
+@profile_methods
 class ExploratoryDataAnalysis:
-    def __init__(self, dataframe):
+    def __init__(self, dataframe, sample_threshold=100000, sample_size=10000, random_state=0):
         """
         Initialize the ExploratoryDataAnalysis with a pandas DataFrame.
         :param dataframe: DataFrame for analysis.
+        :param sample_threshold: Row count above which scatter, pair, density and parallel coordinates
+            plots switch to a size-aware rendering (sampling, hexbin or binned KDE). The strategy and the
+            share of rows used are appended to the plot title.
+        :param sample_size: Number of rows drawn when a plot samples.
+        :param random_state: Seed of the sampling.
         """
         self.df = dataframe
+        self.sample_threshold = sample_threshold
+        self.sample_size = sample_size
+        self.random_state = random_state
+
+    def _is_large(self):
+        return self.sample_threshold is not None and len(self.df) > self.sample_threshold
 
     def basic_summary(self):
         """
@@ -23,136 +266,199 @@ class ExploratoryDataAnalysis:
         print("\nFirst Few Rows:")
         print(self.df.head())
 
-    def plot_distribution(self, column, plot_type='histogram'):
+    def plot_distribution(self, column, plot_type='histogram', ax=None):
         """
         Plots the distribution of a specified column.
         :param column: The column to plot.
         :param plot_type: Type of plot ('histogram' or 'boxplot').
+        :param ax: Optional matplotlib Axes to draw on. If None, the plot is drawn with pyplot and shown.
         """
+        ax, show = _resolve_axes(ax)
         if plot_type == 'histogram':
-            plt.hist(self.df[column].dropna(), bins=30, edgecolor='black')
-            plt.title(f'Histogram of {column}')
-            plt.xlabel(column)
-            plt.ylabel('Frequency')
-            plt.show()
+            ax.hist(self.df[column].dropna(), bins=30, edgecolor='black')
+            ax.set_title(f'Histogram of {column}')
+            ax.set_xlabel(column)
+            ax.set_ylabel('Frequency')
         elif plot_type == 'boxplot':
-            sns.boxplot(x=self.df[column])
-            plt.title(f'Boxplot of {column}')
-            plt.show()
+            sns.boxplot(x=self.df[column], ax=ax)
+            ax.set_title(f'Boxplot of {column}')
+        return _finish(ax, show)
 
-    def plot_correlation_matrix(self):
+    def plot_correlation_matrix(self, ax=None):
         """
-        Plots the correlation matrix of the DataFrame.
+        Plots the correlation matrix of the numeric columns of the DataFrame.
+        :param ax: Optional matplotlib Axes to draw on.
         """
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(self.df.corr(), annot=True, fmt=".2f", cmap='viridis')
-        plt.title('Correlation Matrix')
-        plt.show()
+        ax, show = _resolve_axes(ax, figsize=(10, 8))
+        sns.heatmap(self.df.corr(numeric_only=True), annot=True, fmt=".2f", cmap='viridis', ax=ax)
+        ax.set_title('Correlation Matrix')
+        return _finish(ax, show)
 
-    def countplot_categorical(self, column):
+    def countplot_categorical(self, column, ax=None):
         """
         Creates a count plot for a categorical column.
         :param column: The column to create a count plot for.
+        :param ax: Optional matplotlib Axes to draw on.
         """
-        sns.countplot(x=self.df[column])
-        plt.title(f'Count Plot of {column}')
-        plt.xticks(rotation=45)
-        plt.show()
+        ax, show = _resolve_axes(ax)
+        sns.countplot(x=self.df[column], ax=ax)
+        ax.set_title(f'Count Plot of {column}')
+        ax.tick_params(axis='x', labelrotation=45)
+        return _finish(ax, show)
 
-    def scatterplot_relationship(self, column1, column2):
+    def scatterplot_relationship(self, column1, column2, ax=None, large_strategy='hexbin'):
         """
         Creates a scatter plot to show the relationship between two numerical columns.
         :param column1: First numerical column.
         :param column2: Second numerical column.
+        :param ax: Optional matplotlib Axes to draw on.
+        :param large_strategy: Rendering above `sample_threshold` rows: 'hexbin' (a 2D histogram of all
+            rows, for dense data) or 'sample' (a scatter plot of `sample_size` random rows).
         """
-        sns.scatterplot(x=self.df[column1], y=self.df[column2])
-        plt.title(f'Scatter Plot between {column1} and {column2}')
-        plt.show()
+        ax, show = _resolve_axes(ax)
+        title = f'Scatter Plot between {column1} and {column2}'
+        if not self._is_large():
+            sns.scatterplot(x=self.df[column1], y=self.df[column2], ax=ax)
+        elif large_strategy == 'hexbin':
+            data = self.df[[column1, column2]].dropna()
+            image = ax.hexbin(data[column1].to_numpy(dtype=float), data[column2].to_numpy(dtype=float),
+                              gridsize=60, bins='log', mincnt=1, cmap='viridis')
+            ax.figure.colorbar(image, ax=ax, label='log10(count)')
+            ax.set_xlabel(column1)
+            ax.set_ylabel(column2)
+            title += _size_note('hexbin', len(data), len(self.df))
+        else:
+            sample = stratified_sample(self.df[[column1, column2]], self.sample_size, random_state=self.random_state)
+            sns.scatterplot(x=sample[column1], y=sample[column2], ax=ax, s=8, alpha=0.5)
+            title += _size_note('random sample', len(sample), len(self.df))
+        ax.set_title(title)
+        return _finish(ax, show)
 
-    def time_series_plot(self, date_column, target_column):
+    def time_series_plot(self, date_column, target_column, ax=None):
         """
         Creates a time series plot for a target column.
         :param date_column: The column representing date.
         :param target_column: The target column to plot over time.
+        :param ax: Optional matplotlib Axes to draw on.
         """
-        self.df[date_column] = pd.to_datetime(self.df[date_column])
-        self.df.set_index(date_column, inplace=True)
-        self.df[target_column].plot()
-        plt.title(f'Time Series Plot of {target_column}')
-        plt.ylabel(target_column)
-        plt.show()
-
-    def pairplot_relationships(self, columns, hue=None):
+        ax, show = _resolve_axes(ax)
+        # Plots a re-indexed view of the column instead of setting the index of the shared frame.
+        dates = pd.DatetimeIndex(pd.to_datetime(self.df[date_column]), name=date_column)
+        series = pd.Series(self.df[target_column].to_numpy(), index=dates, name=target_column)
+        series.plot(ax=ax)
+        ax.set_title(f'Time Series Plot of {target_column}')
+        ax.set_ylabel(target_column)
+        return _finish(ax, show)
+
+    def pairplot_relationships(self, columns, hue=None, show=True):
         """
         Plots pairwise relationships for a set of specified columns.
+        seaborn draws pair plots on a figure of its own, so this method cannot target an explicit Axes.
+        Above `sample_threshold` rows the plot uses a sample of `sample_size` rows, stratified by `hue`.
         :param columns: List of columns to include in the plot.
         :param hue: Variable in `data` to map plot aspects to different colors.
+        :param show: Whether to show the figure; pass False to save or adjust the returned PairGrid first.
         """
-        sns.pairplot(self.df[columns], hue=hue)
-        plt.show()
-
-    def barplot_categorical_vs_numerical(self, categorical_column, numerical_column):
+        columns = list(columns) + ([hue] if hue is not None and hue not in columns else [])
+        data = self.df[columns]
+        if self._is_large():
+            data = stratified_sample(data, self.sample_size, by=hue, random_state=self.random_state)
+        grid = sns.pairplot(data, hue=hue)
+        if len(data) < len(self.df):
+            strategy = f'sample stratified by {hue}' if hue is not None else 'random sample'
+            # PairGrid.figure only exists from seaborn 0.11.2; .fig works on every supported version.
+            grid.fig.suptitle('Pair Plot' + _size_note(strategy, len(data), len(self.df)), y=1.02)
+        return _finish(grid, show)
+
+    def barplot_categorical_vs_numerical(self, categorical_column, numerical_column, ax=None):
         """
         Creates a bar plot to compare a numerical column across different categories.
         :param categorical_column: The categorical column.
         :param numerical_column: The numerical column to compare.
+        :param ax: Optional matplotlib Axes to draw on.
         """
-        sns.barplot(x=self.df[categorical_column], y=self.df[numerical_column])
-        plt.xticks(rotation=45)
-        plt.show()
+        ax, show = _resolve_axes(ax)
+        sns.barplot(x=self.df[categorical_column], y=self.df[numerical_column], ax=ax)
+        ax.tick_params(axis='x', labelrotation=45)
+        return _finish(ax, show)
 
     # New Methods
-    def plot_stacked_bar_chart(self, category_column, value_column):
+    def plot_stacked_bar_chart(self, category_column, value_column, ax=None):
         """
         Creates a stacked bar chart for a categorical column and a value column.
         :param category_column: The categorical column.
         :param value_column: The value column for stacking.
+        :param ax: Optional matplotlib Axes to draw on.
         """
+        ax, show = _resolve_axes(ax)
         pivot_data = self.df.pivot_table(index=category_column, columns=value_column, aggfunc='size', fill_value=0)
-        pivot_data.plot(kind='bar', stacked=True)
-        plt.title(f'Stacked Bar Chart of {category_column} by {value_column}')
-        plt.xlabel(category_column)
-        plt.ylabel('Count')
-        plt.xticks(rotation=45)
-        plt.show()
-
-    def plot_density_curve(self, column):
+        pivot_data.plot(kind='bar', stacked=True, ax=ax)
+        ax.set_title(f'Stacked Bar Chart of {category_column} by {value_column}')
+        ax.set_xlabel(category_column)
+        ax.set_ylabel('Count')
+        ax.tick_params(axis='x', labelrotation=45)
+        return _finish(ax, show)
+
+    def plot_density_curve(self, column, ax=None):
         """
-        Plots the density curve of a numerical column.
+        Plots the density curve of a numerical column. Above `sample_threshold` rows the exact seaborn
+        KDE is replaced by binned_kde over all rows.
         :param column: The numerical column to plot.
+        :param ax: Optional matplotlib Axes to draw on.
         """
-        sns.kdeplot(self.df[column], shade=True)
-        plt.title(f'Density Curve of {column}')
-        plt.xlabel(column)
-        plt.show()
+        ax, show = _resolve_axes(ax)
+        title = f'Density Curve of {column}'
+        if self._is_large():
+            values = self.df[column].dropna().to_numpy(dtype=float)
+            grid, density = binned_kde(values)
+            ax.plot(grid, density)
+            ax.fill_between(grid, density, alpha=0.25)
+            ax.set_ylabel('Density')
+            title += _size_note('binned FFT KDE', len(values), len(self.df))
+        else:
+            sns.kdeplot(self.df[column], fill=True, ax=ax)
+        ax.set_title(title)
+        ax.set_xlabel(column)
+        return _finish(ax, show)
 
-    def cumulative_frequency_plot(self, column):
+    def cumulative_frequency_plot(self, column, ax=None):
         """
         Creates a cumulative frequency plot for a numerical column.
         :param column: The numerical column for the cumulative frequency plot.
+        :param ax: Optional matplotlib Axes to draw on.
         """
-        self.df[column].sort_values().cumsum().plot()
-        plt.title(f'Cumulative Frequency of {column}')
-        plt.xlabel(column)
-        plt.ylabel('Cumulative Frequency')
-        plt.show()
-
-    def plot_parallel_coordinates(self, columns, class_column):
+        ax, show = _resolve_axes(ax)
+        self.df[column].sort_values().cumsum().plot(ax=ax)
+        ax.set_title(f'Cumulative Frequency of {column}')
+        ax.set_xlabel(column)
+        ax.set_ylabel('Cumulative Frequency')
+        return _finish(ax, show)
+
+    def plot_parallel_coordinates(self, columns, class_column, ax=None):
         """
-        Plots parallel coordinates for a set of columns.
+        Plots parallel coordinates for a set of columns. Above `sample_threshold` rows only a sample of
+        `sample_size` rows, stratified by `class_column`, is drawn.
         :param columns: List of columns to include in the plot.
         :param class_column: The column to use for coloring.
+        :param ax: Optional matplotlib Axes to draw on.
         """
-        parallel_coordinates(self.df[columns + [class_column]], class_column)
-        plt.xticks(rotation=45)
-        plt.title('Parallel Coordinates Plot')
-        plt.show()
-
-    def plot_radial_chart(self, category_column, value_column):
+        ax, show = _resolve_axes(ax)
+        data = self.df[columns + [class_column]]
+        title = 'Parallel Coordinates Plot'
+        if self._is_large():
+            data = stratified_sample(data, self.sample_size, by=class_column, random_state=self.random_state)
+            title += _size_note(f'sample stratified by {class_column}', len(data), len(self.df))
+        pd.plotting.parallel_coordinates(data, class_column, ax=ax)
+        ax.tick_params(axis='x', labelrotation=45)
+        ax.set_title(title)
+        return _finish(ax, show)
+
+    def plot_radial_chart(self, category_column, value_column, ax=None):
         """
         Plots a radial chart for a categorical column.
         :param category_column: The categorical column.
         :param value_column: The numerical column to plot.
+        :param ax: Optional matplotlib Axes with a polar projection to draw on.
         """
         categories = list(self.df[category_column].unique())
         N = len(categories)
@@ -163,108 +469,215 @@ class ExploratoryDataAnalysis:
         angles = [n / float(N) * 2 * pi for n in range(N)]
         angles += angles[:1]
 
-        ax = plt.subplot(111, polar=True)
-        plt.xticks(angles[:-1], categories, color='grey', size=12)
+        ax, show = _resolve_axes(ax, polar=True)
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(categories, color='grey', size=12)
 
         ax.plot(angles, values)
         ax.fill(angles, values, 'teal', alpha=0.1)
-        plt.show()
+        return _finish(ax, show)
 
 
 
 
 
+@profile_methods
 class ExploratoryDataAnalysisNICS:
+    YEAR_COLUMN = 'date_year'
+    MONTH_COLUMN = 'date_month'
+    STATE_COLUMN = 'state'
+
     def __init__(self, dataframe):
         self.df = dataframe
 
+    @property
+    def df(self):
+        return self._df
+
+    @df.setter
+    def df(self, dataframe):
+        self._df = dataframe
+        self.invalidate_aggregates()
+
+    def invalidate_aggregates(self):
+        """
+        Drops the cached aggregate cube. Replacing self.df, adding or removing rows or columns and
+        in-place edits of the count, year and month columns (or of a categorical state column) are
+        detected automatically; call this after editing the labels of a non-categorical state
+        column in place.
+        """
+        self._cube = None
+        self._cube_key = None
+        self._weights = None
+
+    def _fingerprint(self):
+        """
+        Cheap content checksum of the columns the cube reads: a fixed random weighting of every
+        numeric column (and of the state codes when the state column is categorical). Any in-place
+        edit changes it with overwhelming probability, for a fraction of the cost of the groupby.
+        """
+        if self._weights is None or len(self._weights) != len(self.df):
+            self._weights = np.random.default_rng(0).random(len(self.df))
+        columns = [self.df[column] for column in [self.YEAR_COLUMN, self.MONTH_COLUMN] + self.count_columns()]
+        if isinstance(self.df[self.STATE_COLUMN].dtype, pd.CategoricalDtype):
+            columns.append(self.df[self.STATE_COLUMN].cat.codes)
+        return tuple(float(self._weights @ column.to_numpy(dtype='float64', na_value=np.pi)) for column in columns)
+
+    def aggregate_cube(self):
+        """
+        Returns the sums of every count column per (year, month, state), computed with a single
+        groupby and cached until the frame changes. The year, month and state rollups used by the
+        plots below are derived from this cube instead of re-grouping the raw frame.
+        """
+        key = (id(self.df), self.df.shape, tuple(self.df.columns), self._fingerprint())
+        if self._cube is None or self._cube_key != key:
+            keys = [self.YEAR_COLUMN, self.MONTH_COLUMN, self.STATE_COLUMN]
+            values = self.count_columns()
+            # float64 so that rollups with missing state/year cells plot directly (exact for counts below 2**53).
+            self._cube = self.df.groupby(keys, observed=True, sort=True)[values].sum().astype('float64')
+            self._cube_key = key
+        return self._cube
+
+    def year_state_totals(self, column):
+        """
+        Returns a year x state table of the sums of `column`.
+        """
+        return self.aggregate_cube()[column].groupby(level=[self.YEAR_COLUMN, self.STATE_COLUMN], observed=True).sum().unstack(self.STATE_COLUMN)
+
+    def month_totals(self, columns):
+        """
+        Returns the sums of `columns` per calendar month, over all years and states.
+        """
+        return self.aggregate_cube()[columns].groupby(level=self.MONTH_COLUMN).sum()
+
+    def monthly_state_series(self, column):
+        """
+        Returns a monthly time series of `column` per state, one column per state, indexed by date.
+        """
+        wide = self.aggregate_cube()[column].unstack(self.STATE_COLUMN)
+        years = wide.index.get_level_values(self.YEAR_COLUMN)
+        months = wide.index.get_level_values(self.MONTH_COLUMN)
+        wide.index = pd.to_datetime(pd.DataFrame({'year': years, 'month': months, 'day': 1}))
+        wide.index.name = 'date'
+        return wide
+
     def basic_summary(self):
         print("Basic Summary:")
         print(self.df.describe())
         print("\nFirst Few Rows:")
         print(self.df.head())
 
-    def plot_distribution(self, column, plot_type='histogram'):
+    def plot_distribution(self, column, plot_type='histogram', ax=None):
+        ax, show = _resolve_axes(ax)
         if plot_type == 'histogram':
-            plt.hist(self.df[column].dropna(), bins=30, edgecolor='black')
-            plt.title(f'Histogram of {column}')
-            plt.xlabel(column)
-            plt.ylabel('Frequency')
-            plt.show()
+            ax.hist(self.df[column].dropna(), bins=30, edgecolor='black')
+            ax.set_title(f'Histogram of {column}')
+            ax.set_xlabel(column)
+            ax.set_ylabel('Frequency')
         elif plot_type == 'boxplot':
-            sns.boxplot(x=self.df[column])
-            plt.title(f'Boxplot of {column}')
-            plt.show()
-
-    def plot_correlation_matrix(self):
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(self.df.corr(), annot=True, fmt=".2f", cmap='viridis')
-        plt.title('Correlation Matrix')
-        plt.show()
-
-    def heatmap_for_year_and_state(self, column):
-        self.df['year'] = pd.to_datetime(self.df['date_year'])
-        heatmap_data = self.df.pivot_table(values=column, index='year', columns='state', aggfunc='sum')
-        plt.figure(figsize=(20, 15))
-        sns.heatmap(heatmap_data, annot=False, cmap='viridis')
-        plt.title(f'Heatmap for Year and State Comparison of {column}')
-        plt.show()
-
-    def monthly_sum_comparison(self, columns):
-        monthly_data = self.df.groupby(self.df['date_month'])[columns].sum()
-        monthly_data.plot(kind='bar', stacked=False)
-        plt.title('Monthly Sum Comparison')
-        plt.xlabel('Month')
-        plt.ylabel('Sum')
-        plt.show()
-
-    def cumulative_sum_plot(self, column):
-        self.df[column].cumsum().plot()
-        plt.title(f'Cumulative Sum of {column}')
-        plt.xlabel('Date')
-        plt.ylabel('Cumulative Sum')
-        plt.show()
+            sns.boxplot(x=self.df[column], ax=ax)
+            ax.set_title(f'Boxplot of {column}')
+        return _finish(ax, show)
+
+    def plot_correlation_matrix(self, ax=None):
+        ax, show = _resolve_axes(ax, figsize=(10, 8))
+        sns.heatmap(self.df.corr(numeric_only=True), annot=True, fmt=".2f", cmap='viridis', ax=ax)
+        ax.set_title('Correlation Matrix')
+        return _finish(ax, show)
+
+    def heatmap_for_year_and_state(self, column, ax=None):
+        heatmap_data = self.year_state_totals(column)
+        ax, show = _resolve_axes(ax, figsize=(20, 15))
+        sns.heatmap(heatmap_data, annot=False, cmap='viridis', ax=ax)
+        ax.set_title(f'Heatmap for Year and State Comparison of {column}')
+        return _finish(ax, show)
+
+    def monthly_sum_comparison(self, columns, ax=None):
+        monthly_data = self.month_totals(columns)
+        ax, show = _resolve_axes(ax)
+        monthly_data.plot(kind='bar', stacked=False, ax=ax)
+        ax.set_title('Monthly Sum Comparison')
+        ax.set_xlabel('Month')
+        ax.set_ylabel('Sum')
+        return _finish(ax, show)
+
+    def cumulative_sum_plot(self, column, ax=None):
+        ax, show = _resolve_axes(ax)
+        self.df[column].cumsum().plot(ax=ax)
+        ax.set_title(f'Cumulative Sum of {column}')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Cumulative Sum')
+        return _finish(ax, show)
+
+    def boxplot_by_state(self, column, ax=None):
+        ax, show = _resolve_axes(ax, figsize=(15, 10))
+        # One cube cell per month and state, i.e. the raw NICS rows when there is one row per month and state.
+        sns.boxplot(x=self.STATE_COLUMN, y=column, data=self.aggregate_cube()[column].reset_index(), ax=ax)
+        ax.set_title(f'Boxplot of {column} by State')
+        ax.tick_params(axis='x', labelrotation=90)
+        return _finish(ax, show)
+
+    def plot_statewise_trends(self, column, ax=None):
+        ax, show = _resolve_axes(ax)
+        for state, state_data in self.monthly_state_series(column).items():
+            state_data.dropna().plot(label=state, ax=ax)
+        ax.legend()
+        ax.set_title(f'State-wise Trends of {column}')
+        ax.set_ylabel(column)
+        return _finish(ax, show)
+
+    def count_columns(self):
+        """
+        Returns the numeric columns of the frame other than the date components.
+        """
+        keys = (self.YEAR_COLUMN, self.MONTH_COLUMN, self.STATE_COLUMN, 'date_day')
+        return [column for column in self.df.columns if column not in keys and self.df[column].dtype.kind in 'biufc']
 
-    def boxplot_by_state(self, column):
-        plt.figure(figsize=(15, 10))
-        sns.boxplot(x='state', y=column, data=self.df)
-        plt.title(f'Boxplot of {column} by State')
-        plt.xticks(rotation=90)
-        plt.show()
+    def statistics_report(self, columns=None, by_state=False, ddof=0):
+        """
+        Returns mean, median, mode, std, var, skew and kurtosis of all count columns in one pass
+        (see describe_columns).
+        :param columns: Columns to include. If None, all count columns.
+        :param by_state: Boolean, whether to compute the statistics per state.
+        :return: Tidy DataFrame indexed by column, or by (state, column) when by_state is True.
+        """
+        return describe_columns(self.df, columns or self.count_columns(),
+                                by=self.STATE_COLUMN if by_state else None, ddof=ddof)
 
-    def plot_statewise_trends(self, column):
-        for state in self.df['state'].unique():
-            state_data = self.df[self.df['state'] == state]
-            state_data.set_index('date')[column].plot(label=state)
-        plt.legend()
-        plt.title(f'State-wise Trends of {column}')
-        plt.ylabel(column)
-        plt.show()
+    def normality_report(self, columns=None, by_state=False, large_test='normaltest', alpha=0.05):
+        """
+        Tests all count columns for normality (see normality_tests). Samples above 5000 values use
+        the D'Agostino-Pearson test, or a Shapiro-Wilk test on a subsample with large_test='subsample'.
+        :return: Tidy DataFrame indexed by column, or by (state, column) when by_state is True.
+        """
+        return normality_tests(self.df, columns or self.count_columns(),
+                               by=self.STATE_COLUMN if by_state else None, large_test=large_test, alpha=alpha)
 
     def statistical_analysis(self, column):
-        data = self.df[column].dropna()
+        result = self.statistics_report([column]).loc[column]
         print(f"Statistical Analysis for {column}:")
-        print("Mean:", np.mean(data))
-        print("Median:", np.median(data))
-        mode_result = stats.mode(data)
-        # print("Mode:", mode_result.mode[0] if mode_result.count[0] > 0 else "No mode")
-        print("Standard Deviation:", np.std(data))
-        print("Variance:", np.var(data))
+        print("Mean:", result['mean'])
+        print("Median:", result['median'])
+        print("Mode:", result['mode'])
+        print("Standard Deviation:", result['std'])
+        print("Variance:", result['var'])
+        print("Skewness:", result['skew'])
+        print("Kurtosis:", result['kurtosis'])
 
     def validate_data_normality(self, column):
-        data = self.df[column].dropna()
-        stat, p_value = shapiro(data)
-        print(f"Normality Test for {column}:")
-        print("Statistics:", stat)
-        print("P-Value:", p_value)
-        if p_value > 0.05:
+        result = self.normality_report([column]).loc[column]
+        print(f"Normality Test for {column} ({result['test']}, n={result['n']}):")
+        print("Statistics:", result['statistic'])
+        print("P-Value:", result['p_value'])
+        if result['p_value'] > 0.05:
             print("Data is likely normal.")
         else:
             print("Data is likely not normal.")
 
-    def plot_regression(self, column1, column2):
-        sns.regplot(x=column1, y=column2, data=self.df)
-        plt.title(f'Regression Line between {column1} and {column2}')
-        plt.xlabel(column1)
-        plt.ylabel(column2)
-        plt.show()
\ No newline at end of file
+    def plot_regression(self, column1, column2, ax=None):
+        ax, show = _resolve_axes(ax)
+        sns.regplot(x=column1, y=column2, data=self.df, ax=ax)
+        ax.set_title(f'Regression Line between {column1} and {column2}')
+        ax.set_xlabel(column1)
+        ax.set_ylabel(column2)
+        return _finish(ax, show)
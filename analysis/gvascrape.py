@@ -1,47 +1,494 @@
-import requests
-from bs4 import BeautifulSoup
+import datetime
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlparse
+
 import pandas as pd
 
+from .lazy_imports import LazyModule, optional_module
+
+# HTTP and HTML parsing libraries are imported on first use.
+requests = LazyModule('requests')
+bs4 = LazyModule('bs4')
+lxml_html = optional_module('lxml.html')
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _row_links(links):
+    """
+    Picks the incident and source hrefs out of a row's (text, href) link pairs in a single scan.
+    """
+    incident_link = source_link = None
+    for text, href in links:
+        if incident_link is None and 'View Incident' in text:
+            incident_link = href
+        if source_link is None and 'View Source' in text:
+            source_link = href
+    return incident_link, source_link
+
+
+def extract_table_bs4(content):
+    """
+    Extracts the incident table from a page with BeautifulSoup and the pure-Python html.parser.
+    :param content: bytes or str, HTML of a results page.
+    :return: Tuple of (headers, rows). Each row ends with the incident and source links.
+    """
+    table = bs4.BeautifulSoup(content, 'html.parser').find('table', {'class': 'responsive'})
+    headers = [header.text.strip() for header in table.find_all('th')]
+    headers.extend(['View Incident Link', 'View Source Link'])
+
+    rows = []
+    for row in table.find_all('tr'):
+        cols = row.find_all('td')
+        if cols:
+            row_data = [ele.text.strip() for ele in cols]
+            links = ((link.text, link['href']) for link in row.find_all('a', href=True))
+            row_data.extend(_row_links(links))
+            rows.append(row_data)
+    return headers, rows
+
+
+def extract_table_lxml(content):
+    """
+    Extracts the incident table from a page with lxml. Produces the same output as extract_table_bs4.
+    :param content: bytes or str, HTML of a results page.
+    :return: Tuple of (headers, rows). Each row ends with the incident and source links.
+    """
+    tree = lxml_html.fromstring(content)
+    table = tree.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " responsive ")]')[0]
+    headers = [header.text_content().strip() for header in table.iter('th')]
+    headers.extend(['View Incident Link', 'View Source Link'])
+
+    rows = []
+    for row in table.iter('tr'):
+        cols = row.xpath('.//td')
+        if cols:
+            row_data = [ele.text_content().strip() for ele in cols]
+            links = ((link.text_content(), link.get('href')) for link in row.xpath('.//a[@href]'))
+            row_data.extend(_row_links(links))
+            rows.append(row_data)
+    return headers, rows
+
+
+PARSER_BACKENDS = {
+    'bs4': extract_table_bs4,
+    'lxml': extract_table_lxml,
+}
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests so that no single host receives more than a fixed number of requests per second.
+
+    The limiter is shared by all worker threads of a GunViolenceDataCollector. Each host gets its own
+    schedule, so a crawl that touches several hosts is only throttled per host.
+
+    Attributes:
+        min_interval (float): Minimum number of seconds between two requests to the same host.
+    """
+    def __init__(self, requests_per_second=None):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """
+        Blocks until a request to the host of `url` is allowed.
+        :param url: str, URL about to be requested.
+        """
+        if not self.min_interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ScrapeCheckpoint:
+    """
+    Append-only record of the pages a crawl has already scraped.
+
+    Every completed page is written as one JSON line holding its URL, table headers and rows, so an
+    interrupted crawl can be resumed without downloading those pages again. A partially written last
+    line (e.g. after a crash) is ignored on load.
+
+    Attributes:
+        path (str): Location of the checkpoint file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """
+        Reads the completed pages from the checkpoint file, if it exists.
+        """
+        self._pages = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._pages[entry['url']] = (entry['headers'], entry['rows'])
+
+    def get(self, url):
+        """
+        Returns the (headers, rows) recorded for `url`, or None if the page has not been scraped yet.
+        """
+        return self._pages.get(url)
+
+    def save(self, url, headers, rows):
+        """
+        Records a completed page.
+        :param url: str, URL of the scraped page.
+        :param headers: list of str, table headers of the page.
+        :param rows: list of lists, parsed table rows of the page.
+        """
+        line = json.dumps({'url': url, 'headers': headers, 'rows': rows})
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as handle:
+                handle.write(line + '\n')
+            self._pages[url] = (headers, rows)
+
+    def clear(self):
+        """
+        Forgets all completed pages and removes the checkpoint file.
+        """
+        with self._lock:
+            self._pages = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __len__(self):
+        return len(self._pages)
+
+
+class ResponseCache:
+    """
+    On-disk cache of page responses, keyed by the SHA-256 of the URL.
+
+    Each entry is stored as a body file plus a small JSON metadata file holding the ETag,
+    Last-Modified header and fetch time. Freshness is decided per year (taken from the `year`
+    query parameter of the URL): a page of a past year that was fetched after that year ended
+    (plus `past_year_grace` for late corrections) no longer changes and is served from disk
+    without a request, while other pages, including a past year's page fetched while that year
+    was still running, are revalidated with a conditional request (If-None-Match /
+    If-Modified-Since) once `current_year_ttl` has expired.
+
+    Attributes:
+        cache_dir (str): Directory holding the cached entries.
+        ttl_by_year (dict): Optional TTL in seconds per year, overriding the defaults. None means never expire.
+        current_year_ttl (float): TTL in seconds for pages that may still change. 0 revalidates on every use.
+        past_year_grace (float): Seconds after the end of a year during which its pages may still change.
+        default_ttl (float or None): TTL in seconds for URLs without a year.
+        hits (int): Number of responses served from disk without a request.
+        revalidations (int): Number of stale entries confirmed unchanged by a 304 response.
+        misses (int): Number of responses that had to be downloaded.
+    """
+    def __init__(self, cache_dir, ttl_by_year=None, current_year_ttl=0, default_ttl=0, past_year_grace=30 * 86400):
+        self.cache_dir = cache_dir
+        self.ttl_by_year = dict(ttl_by_year or {})
+        self.current_year_ttl = current_year_ttl
+        self.past_year_grace = past_year_grace
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return directory, os.path.join(directory, key + '.body'), os.path.join(directory, key + '.json')
+
+    @staticmethod
+    def year_of(url):
+        """
+        Returns the `year` query parameter of `url` as an int, or None.
+        """
+        year = parse_qs(urlparse(url).query).get('year')
+        return int(year[0]) if year and year[0].isdigit() else None
+
+    def ttl_for(self, url, meta=None):
+        """
+        Returns the TTL in seconds that applies to `url`, or None if its entry never expires.
+        :param meta: Optional metadata of the cached entry. A past year's page only never expires
+            when it was fetched after the end of that year plus `past_year_grace`.
+        """
+        year = self.year_of(url)
+        if year is None:
+            return self.default_ttl
+        if year in self.ttl_by_year:
+            return self.ttl_by_year[year]
+        if year < datetime.date.today().year:
+            settled = datetime.datetime(year + 1, 1, 1).timestamp() + self.past_year_grace
+            if meta is None or meta['fetched_at'] >= settled:
+                return None
+        return self.current_year_ttl
+
+    def lookup(self, url):
+        """
+        Reads the cached entry for `url`.
+        :return: Tuple of (metadata dict, body bytes), or None if the URL is not cached.
+        """
+        _, body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as handle:
+                meta = json.load(handle)
+            with open(body_path, 'rb') as handle:
+                return meta, handle.read()
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, url, meta):
+        """
+        Tells whether a cached entry can be used without contacting the server.
+        """
+        ttl = self.ttl_for(url, meta)
+        return ttl is None or time.time() - meta['fetched_at'] < ttl
+
+    @staticmethod
+    def conditional_headers(meta):
+        """
+        Returns the revalidation headers for a cached entry.
+        """
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url, response):
+        """
+        Writes a downloaded response to the cache.
+        :param url: str, requested URL.
+        :param response: requests.Response with a 200 status code.
+        """
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        self._write(url, meta, response.content)
+
+    def refresh(self, url, meta, body):
+        """
+        Marks a cached entry as revalidated, restarting its TTL.
+        """
+        meta = dict(meta, fetched_at=time.time())
+        self._write(url, meta, body)
+
+    def _write(self, url, meta, body):
+        directory, body_path, meta_path = self._paths(url)
+        os.makedirs(directory, exist_ok=True)
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(body_path + suffix, 'wb') as handle:
+            handle.write(body)
+        os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as handle:
+            json.dump(meta, handle)
+        os.replace(meta_path + suffix, meta_path)
+
+    def count(self, outcome):
+        """
+        Increments one of the 'hits', 'revalidations' or 'misses' counters.
+        """
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        """
+        Returns the hit, revalidation and miss counters as a dict.
+        """
+        return {'hits': self.hits, 'revalidations': self.revalidations, 'misses': self.misses}
+
+
 class GunViolenceDataCollector:
     """
     A class to systematically scrape and compile gun violence data from a specified website.
 
     The GunViolenceDataCollector class is designed to navigate through a website dedicated to reporting gun violence incidents. It leverages the BeautifulSoup library to parse HTML content and the pandas library to structure the extracted data. The class can process multiple years of data, handling website pagination to ensure comprehensive data collection.
 
+    Pages can be fetched concurrently by a bounded thread pool (`max_workers`), throttled per host (`requests_per_second`) and retried with exponential backoff on connection errors and retryable status codes. When a `checkpoint_path` is given, every completed page is recorded there so an interrupted crawl resumes from the pages it has not finished yet; the checkpoint is cleared once `scrape_data`, `iter_data_for_years` or `collect_data_for_years` completes, so a later crawl starts fresh. A `response_cache` keeps page responses on disk between runs, so repeat crawls only download pages that changed.
+
     Attributes:
         base_url (str): The root URL of the website from where the data will be scraped.
-        session (requests.Session): An instance of requests.Session to manage web requests, maintaining consistent headers and cookies.
+        session (requests.Session): An instance of requests.Session to manage web requests, maintaining consistent headers and cookies. Worker threads use their own sessions.
+        max_workers (int): Number of pages fetched concurrently. 1 keeps the original sequential behaviour.
+        max_retries (int): Number of retries for a failed request before the error is raised.
+        backoff_factor (float): Base delay in seconds of the exponential backoff between retries.
+        timeout (float): Timeout in seconds of a single request.
+        rate_limiter (HostRateLimiter): Per-host request throttle shared by all workers.
+        checkpoint (ScrapeCheckpoint or None): Record of completed pages used to resume an interrupted crawl. Cleared when the crawl completes.
+        response_cache (ResponseCache or None): On-disk response cache consulted before every request.
+        parser_backend (str): Table extractor used for result pages, 'bs4' (default) or 'lxml' (requires the lxml package). Both produce identical DataFrames.
 
     Methods:
+        fetch_content(url: str) -> bytes:
+            Returns the body of the given URL, served from the response cache when it is fresh and revalidated when it is stale.
+
         fetch_soup(url: str) -> BeautifulSoup:
             Sends a GET request to the given URL, handles response errors, and returns a BeautifulSoup object for HTML parsing.
 
         get_last_page_number(url: str) -> int:
-            Identifies and returns the number of the last page of data for a specific year, aiding in pagination handling.
+            Identifies and returns the number of the last page of data for a specific year, aiding in pagination handling. Results are remembered for as long as the response cache would serve the page without a request; without a cache, only past years are remembered, as the current year keeps growing.
 
         collect_pagination_urls(year: int) -> List[str]:
             Generates a list of all URLs corresponding to the paginated data for a given year.
 
+        extract_table(content: bytes) -> Tuple[List[str], List[list]]:
+            Extracts the table headers and rows, including the incident and source links, from raw page HTML with the configured parser backend.
+
+        scrape_pages(urls: List[str]) -> List[Tuple[List[str], List[list]]]:
+            Scrapes the given pages, concurrently when `max_workers` > 1, skipping pages already recorded in the checkpoint.
+
         scrape_data(year: int) -> pd.DataFrame:
             Extracts gun violence data for the specified year, parses it, and returns it as a pandas DataFrame. The data includes incident details and relevant hyperlinks.
 
+        iter_data_for_years(start_year: int, end_year: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+            Yields each year's data as soon as it is scraped, for callers that stream the years to disk.
+
         collect_data_for_years(start_year: int, end_year: int) -> pd.DataFrame:
-            Aggregates gun violence data across a range of years into a consolidated pandas DataFrame. Each year's data is scraped and appended to form a comprehensive dataset.
+            Aggregates gun violence data across a range of years into a consolidated pandas DataFrame. Each year's data is scraped and the frames are concatenated once at the end.
     """
-    def __init__(self, base_url):
+    def __init__(self, base_url, max_workers=1, requests_per_second=None, max_retries=3,
+                 backoff_factor=0.5, timeout=30, checkpoint_path=None, parser_backend='bs4',
+                 response_cache=None):
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend '{parser_backend}', expected one of {sorted(PARSER_BACKENDS)}")
+        if parser_backend == 'lxml' and lxml_html is None:
+            raise ImportError("The 'lxml' parser backend requires the lxml package.")
         self.base_url = base_url
         self.session = requests.Session()
         self.headers = {'User-Agent': 'Mozilla/5.0'}
+        self.max_workers = max(1, int(max_workers))
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.checkpoint = ScrapeCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.parser_backend = parser_backend
+        self.response_cache = response_cache
+        self._last_page_numbers = {}
+        self._local = threading.local()
+        self._crawl_depth = 0
+
+    @contextmanager
+    def _crawl(self):
+        """
+        Wraps a complete crawl. When the outermost crawl finishes without an error the checkpoint is
+        cleared; an interrupted crawl keeps it so the next run resumes.
+        """
+        self._crawl_depth += 1
+        try:
+            yield
+        finally:
+            self._crawl_depth -= 1
+        if self._crawl_depth == 0 and self.checkpoint is not None:
+            self.checkpoint.clear()
+
+    def _get_session(self):
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt) * (1 + random.random() / 2)
+
+    def fetch_response(self, url, extra_headers=None):
+        """
+        Sends a GET request, retrying with exponential backoff on connection errors and on
+        429/5xx responses.
+        :param url: str, URL to fetch.
+        :param extra_headers: dict, additional request headers (e.g. conditional request headers).
+        :return: requests.Response with a successful (or 304 Not Modified) status code.
+        """
+        session = self._get_session()
+        headers = dict(self.headers, **extra_headers) if extra_headers else self.headers
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait(url)
+            try:
+                response = session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+            response.raise_for_status()
+            return response
+
+    def fetch_content(self, url):
+        cache = self.response_cache
+        if cache is None:
+            return self.fetch_response(url).content
+        cached = cache.lookup(url)
+        if cached is None:
+            response = self.fetch_response(url)
+        else:
+            meta, body = cached
+            if cache.is_fresh(url, meta):
+                cache.count('hits')
+                return body
+            response = self.fetch_response(url, cache.conditional_headers(meta))
+            if response.status_code == 304:
+                cache.count('revalidations')
+                cache.refresh(url, meta, body)
+                return body
+        cache.count('misses')
+        cache.store(url, response)
+        return response.content
 
     def fetch_soup(self, url):
-        response = self.session.get(url, headers=self.headers)
-        response.raise_for_status()
-        return BeautifulSoup(response.content, 'html.parser')
+        return bs4.BeautifulSoup(self.fetch_content(url), 'html.parser')
+
+    def _last_page_ttl(self, url, memoized_at):
+        """
+        Returns how long a remembered last page number stays valid, or None if it never expires: as
+        long as the response cache keeps the page fresh, and without a cache only for past years.
+        """
+        if self.response_cache is not None:
+            return self.response_cache.ttl_for(url, {'fetched_at': memoized_at})
+        year = ResponseCache.year_of(url)
+        return None if year is not None and year < datetime.date.today().year else 0
 
     def get_last_page_number(self, url):
+        if url in self._last_page_numbers:
+            last_page_number, memoized_at = self._last_page_numbers[url]
+            ttl = self._last_page_ttl(url, memoized_at)
+            if ttl is None or time.time() - memoized_at < ttl:
+                return last_page_number
         soup = self.fetch_soup(url)
         last_page_link = soup.find('li', class_='pager-last').find('a')['href']
         last_page_number = int(last_page_link.split('page=')[-1].split('&')[0])
+        self._last_page_numbers[url] = (last_page_number, time.time())
         return last_page_number
 
     def collect_pagination_urls(self, year):
@@ -49,36 +496,64 @@ class GunViolenceDataCollector:
         last_page_number = self.get_last_page_number(url)
         return [f"{self.base_url}/reports/total-number-of-incidents?page={i}&year={year}" for i in range(last_page_number + 1)]
 
+    def extract_table(self, content):
+        return PARSER_BACKENDS[self.parser_backend](content)
+
+    def scrape_page(self, url):
+        """
+        Scrapes a single page, or returns its recorded result if the checkpoint already holds it.
+        :param url: str, URL of the page.
+        :return: Tuple of (headers, rows) for the page.
+        """
+        if self.checkpoint is not None:
+            cached = self.checkpoint.get(url)
+            if cached is not None:
+                return cached
+        headers, rows = self.extract_table(self.fetch_content(url))
+        if self.checkpoint is not None:
+            self.checkpoint.save(url, headers, rows)
+        return headers, rows
+
+    def scrape_pages(self, urls):
+        """
+        Scrapes a list of pages, using up to `max_workers` concurrent requests.
+        :param urls: list of str, URLs of the pages.
+        :return: List of (headers, rows) tuples in the same order as `urls`.
+        """
+        if self.max_workers == 1 or len(urls) <= 1:
+            return [self.scrape_page(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.scrape_page, urls))
+
     def scrape_data(self, year):
         all_data = []
-        pagination_urls = self.collect_pagination_urls(year)
-        for url in pagination_urls:
-            soup = self.fetch_soup(url)
-            table = soup.find('table', {'class': 'responsive'})
-            headers = [header.text.strip() for header in table.find_all('th')]
-            headers.extend(['View Incident Link', 'View Source Link'])
-
-            for row in table.find_all('tr'):
-                cols = row.find_all('td')
-                if cols:
-                    row_data = [ele.text.strip() for ele in cols]
-                    links = row.find_all('a', href=True)
-                    incident_link = next((link['href'] for link in links if 'View Incident' in link.text), None)
-                    source_link = next((link['href'] for link in links if 'View Source' in link.text), None)
-                    row_data.extend([incident_link, source_link])
-                    all_data.append(row_data)
+        headers = []
+        with self._crawl():
+            pagination_urls = self.collect_pagination_urls(year)
+            for page_headers, rows in self.scrape_pages(pagination_urls):
+                headers = page_headers
+                all_data.extend(rows)
 
         df = pd.DataFrame(all_data, columns=headers)
         df.drop(columns=['Operations'], inplace=True)
-        df['View Incident Link'] = df['View Incident Link'].apply(lambda x: self.base_url + x if x else None)
+        links = df['View Incident Link']
+        df['View Incident Link'] = (self.base_url + links.fillna('')).where(links.fillna('') != '', None)
         return df
 
-    def collect_data_for_years(self, start_year, end_year):
-        all_years_df = pd.DataFrame()
-        for year in range(start_year, end_year + 1):
-            year_df = self.scrape_data(year)
-            all_years_df = pd.concat([all_years_df, year_df])
-        return all_years_df
-
-
+    def iter_data_for_years(self, start_year, end_year):
+        """
+        Scrapes the given range of years one year at a time.
+        :param start_year: int, first year to scrape.
+        :param end_year: int, last year to scrape (inclusive).
+        :return: Generator of (year, DataFrame) tuples, so callers can write each year to disk without holding every year in memory.
+            The checkpoint is cleared only after the last year, not when the generator is closed early.
+        """
+        with self._crawl():
+            for year in range(start_year, end_year + 1):
+                yield year, self.scrape_data(year)
 
+    def collect_data_for_years(self, start_year, end_year):
+        year_frames = [year_df for _, year_df in self.iter_data_for_years(start_year, end_year)]
+        if not year_frames:
+            return pd.DataFrame()
+        return pd.concat(year_frames)
@@ -0,0 +1,251 @@
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .data_acquisition import CACHE_FORMAT
+
+# Column names of GunViolenceDataCollector output, mapped to the names used by the store (and by the
+# Kaggle gun-violence-data export).
+SCRAPED_COLUMNS = {
+    'Incident ID': 'incident_id',
+    'Incident Date': 'date',
+    'State': 'state',
+    'City Or County': 'city_or_county',
+    'Address': 'address',
+    '# Killed': 'n_killed',
+    '# Injured': 'n_injured',
+    'View Incident Link': 'incident_url',
+    'View Source Link': 'source_url',
+}
+
+GVA_DATE_FORMAT = '%B %d, %Y'
+
+CATEGORICAL_COLUMNS = ['state', 'city_or_county']
+
+
+class _SortedIndex:
+    """
+    Secondary index over a categorical column: row positions ordered by (code, date), with the
+    offsets of each code's block, so the rows of one category within a date range are one slice.
+    """
+    def __init__(self, codes, dates):
+        self.order = np.lexsort((dates, codes))
+        self.dates = dates[self.order]
+        self.offsets = np.searchsorted(codes[self.order], np.arange(codes.max(initial=-1) + 2))
+
+    def positions(self, code, start=None, end=None):
+        if code < 0 or code + 1 >= len(self.offsets):
+            return self.order[:0]
+        low, high = self.offsets[code], self.offsets[code + 1]
+        dates = self.dates[low:high]
+        if start is not None:
+            low += np.searchsorted(dates, start, side='left')
+        if end is not None:
+            high = self.offsets[code] + np.searchsorted(dates, end, side='right')
+        return self.order[low:high]
+
+
+class IncidentStore:
+    """
+    Persistent, indexed store of Gun Violence Archive incidents.
+
+    Incidents are kept sorted by date with the state and city columns dictionary-encoded as
+    categoricals, numeric counts as small integers and the incident ID as an int64 parsed from
+    the incident link. The link prefix (e.g. 'https://www.gunviolencearchive.org/incident/') is
+    stored once and incident_url() rebuilds full links on demand. Date ranges are answered by
+    binary search on the sorted dates, and per-state and per-city queries by secondary indexes
+    ordered by (category, date), so a lookup touches only the matching rows instead of scanning
+    every row with a boolean mask.
+
+    Inserting a re-scrape deduplicates on the incident ID; by default the newer row wins.
+
+    Example:
+        store = IncidentStore('incidents')
+        store.insert(collector.collect_data_for_years(2019, 2022))
+        store.save()
+        texas_2021 = IncidentStore.open('incidents').query('2021-01-01', '2021-12-31', state='Texas')
+    """
+    def __init__(self, path=None):
+        """
+        :param path: str, optional directory the store is saved to and opened from.
+        """
+        self.path = path
+        self.link_prefix = None
+        self.df = None
+        self._indexes = {}
+
+    @classmethod
+    def open(cls, path):
+        """
+        Opens a store saved with save(), or returns an empty store if `path` does not exist yet.
+        """
+        store = cls(path)
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as handle:
+                meta = json.load(handle)
+            data_path = os.path.join(path, f"incidents.{meta['format']}")
+            store.link_prefix = meta['link_prefix']
+            store.df = pd.read_parquet(data_path) if meta['format'] == 'parquet' else pd.read_pickle(data_path)
+            store._build_indexes()
+        return store
+
+    def save(self, path=None):
+        """
+        Writes the store to `path` (default: the path it was created with).
+
+        Both files are written to temporary files and moved into place, the metadata last, so an
+        interrupted save leaves the previous store readable.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("IncidentStore.save needs a path.")
+        os.makedirs(path, exist_ok=True)
+        data_path = os.path.join(path, f'incidents.{CACHE_FORMAT}')
+        meta_path = os.path.join(path, 'meta.json')
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        if CACHE_FORMAT == 'parquet':
+            self.df.to_parquet(data_path + suffix, index=False)
+        else:
+            self.df.to_pickle(data_path + suffix)
+        os.replace(data_path + suffix, data_path)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as handle:
+            json.dump({'format': CACHE_FORMAT, 'link_prefix': self.link_prefix, 'rows': len(self.df)}, handle)
+        os.replace(meta_path + suffix, meta_path)
+        self.path = path
+
+    def __len__(self):
+        return 0 if self.df is None else len(self.df)
+
+    def _split_links(self, urls):
+        """
+        Parses integer incident IDs out of incident links and checks that they share one prefix.
+        Links that do not end in an ID get a missing ID and are left out of the prefix check.
+        """
+        present = urls.notna() & (urls != '')
+        present &= urls.str.contains(r'\d+/?$', regex=True).fillna(False)
+        if not present.any():
+            return pd.Series(np.nan, index=urls.index)
+        prefix = self.link_prefix
+        if prefix is None:
+            match = re.match(r'^(.*?)\d+/?$', urls[present].iloc[0])
+            prefix = match.group(1) if match is not None else urls[present].iloc[0]
+        matches = urls.str.startswith(prefix).fillna(False)
+        if not matches[present].all():
+            others = sorted(urls[present & ~matches].str.replace(r'\d+/?$', '', regex=True).unique())
+            raise ValueError(f"Incident links with different prefixes: {[prefix] + others}")
+        self.link_prefix = prefix
+        return pd.to_numeric(urls.str.slice(len(prefix)).str.rstrip('/').where(present), errors='coerce')
+
+    def _normalize(self, frame, date_format):
+        if 'Incident Date' in frame.columns and date_format is None:
+            date_format = GVA_DATE_FORMAT
+        frame = frame.rename(columns=SCRAPED_COLUMNS).drop(columns=['Operations'], errors='ignore')
+
+        incident_id = pd.Series(np.nan, index=frame.index)
+        if 'incident_url' in frame.columns:
+            incident_id = self._split_links(frame['incident_url'].astype('string'))
+            frame = frame.drop(columns='incident_url')
+        if 'incident_id' in frame.columns:
+            incident_id = incident_id.fillna(pd.to_numeric(frame['incident_id'], errors='coerce'))
+        frame = frame.assign(incident_id=incident_id)
+        frame = frame[frame['incident_id'].notna()].copy()
+        frame['incident_id'] = frame['incident_id'].astype('int64')
+
+        # Report dates repeat a lot: parse each distinct date once.
+        codes, uniques = pd.factorize(frame['date'])
+        frame['date'] = pd.DatetimeIndex(pd.to_datetime(uniques, format=date_format)).take(
+            codes, allow_fill=True, fill_value=pd.NaT)
+        for column in ('n_killed', 'n_injured'):
+            if column in frame.columns:
+                frame[column] = pd.to_numeric(frame[column], downcast='integer')
+        for column in CATEGORICAL_COLUMNS:
+            if column in frame.columns:
+                frame[column] = frame[column].astype(object)
+        return frame
+
+    def _build_indexes(self):
+        dates = self.df['date'].to_numpy()
+        self._dates = dates
+        self._ids_order = np.argsort(self.df['incident_id'].to_numpy(), kind='stable')
+        self._ids = self.df['incident_id'].to_numpy()[self._ids_order]
+        self._indexes = {column: _SortedIndex(self.df[column].cat.codes.to_numpy(), dates)
+                         for column in CATEGORICAL_COLUMNS if column in self.df.columns}
+
+    def insert(self, frame, date_format=None, keep='last'):
+        """
+        Adds incidents, replacing (keep='last') or ignoring (keep='first') incidents already stored.
+        :param frame: DataFrame from GunViolenceDataCollector (or in the Kaggle export layout).
+        :param date_format: Optional strftime format of the dates; GVA report dates are parsed with
+            '%B %d, %Y' by default.
+        :param keep: 'last' to let the inserted rows win over stored ones, 'first' to keep stored rows.
+        :return: Number of incidents that were not in the store before.
+        """
+        if keep not in ('first', 'last'):
+            raise ValueError("keep must be 'first' or 'last'")
+        new = self._normalize(frame, date_format)
+        before = len(self)
+        if self.df is not None:
+            new = pd.concat([self.df.astype({column: object for column in CATEGORICAL_COLUMNS if column in self.df}), new],
+                            ignore_index=True)
+        new = new.drop_duplicates('incident_id', keep=keep)
+        new = new.sort_values(['date', 'incident_id'], kind='stable', ignore_index=True)
+        for column in CATEGORICAL_COLUMNS:
+            if column in new.columns:
+                new[column] = new[column].astype('category')
+        self.df = new
+        self._build_indexes()
+        return len(self) - before
+
+    def query(self, start=None, end=None, state=None, city=None, columns=None):
+        """
+        Returns the incidents in a date range, optionally restricted to a state and/or a city.
+        :param start: Inclusive start date (str or Timestamp); None for no lower bound.
+        :param end: Inclusive end date; None for no upper bound.
+        :param state: Optional state name.
+        :param city: Optional value of `city_or_county`.
+        :param columns: Optional list of columns to return.
+        :return: DataFrame sorted by date.
+        """
+        if self.df is None:
+            return pd.DataFrame()
+        start = None if start is None else np.datetime64(pd.Timestamp(start), 'ns').astype(self._dates.dtype)
+        end = None if end is None else np.datetime64(pd.Timestamp(end), 'ns').astype(self._dates.dtype)
+        if city is not None or state is not None:
+            column, value = ('city_or_county', city) if city is not None else ('state', state)
+            code = self.df[column].cat.categories.get_indexer([value])[0]
+            positions = np.sort(self._indexes[column].positions(code, start, end))
+            if city is not None and state is not None:
+                state_code = self.df['state'].cat.categories.get_indexer([state])[0]
+                positions = positions[self.df['state'].cat.codes.to_numpy()[positions] == state_code]
+            result = self.df.take(positions)
+        else:
+            low = 0 if start is None else np.searchsorted(self._dates, start, side='left')
+            high = len(self._dates) if end is None else np.searchsorted(self._dates, end, side='right')
+            result = self.df.iloc[low:high]
+        return result if columns is None else result[columns]
+
+    def get(self, incident_ids):
+        """
+        Looks incidents up by ID.
+        :param incident_ids: int or list of ints.
+        :return: DataFrame of the stored incidents among `incident_ids`.
+        """
+        if self.df is None:
+            return pd.DataFrame()
+        if len(self._ids) == 0:
+            return self.df.iloc[:0]
+        ids = np.atleast_1d(np.asarray(incident_ids, dtype='int64'))
+        slots = np.minimum(np.searchsorted(self._ids, ids), len(self._ids) - 1)
+        found = self._ids[slots] == ids
+        return self.df.take(self._ids_order[slots[found]])
+
+    def incident_url(self, incident_ids):
+        """
+        Rebuilds the full incident links of `incident_ids` from the stored prefix.
+        """
+        return self.link_prefix + pd.Series(incident_ids).astype(str)
@@ -0,0 +1,39 @@
+import importlib
+import importlib.util
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access, so that plotting, scraping
+    and Parquet libraries are only loaded by the code paths that use them.
+
+    Example:
+        plt = LazyModule('matplotlib.pyplot')
+        plt.figure()  # matplotlib.pyplot is imported here
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+
+def is_installed(name):
+    """
+    Checks whether a top-level package can be imported, without importing it.
+    """
+    return importlib.util.find_spec(name) is not None
+
+
+def optional_module(name):
+    """
+    Returns a LazyModule for `name`, or None when its top-level package is not installed.
+    """
+    return LazyModule(name) if is_installed(name.split('.')[0]) else None
@@ -0,0 +1,278 @@
+import glob
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .data_acquisition import CACHE_FORMAT, NICS_COUNT_COLUMNS, NICS_DATE_FORMATS, NICS_DTYPES, DataAcquisition, file_sha256
+from .data_transform import DataTransformer
+
+
+def prepare_nics_rows(rows):
+    """
+    Default per-row preparation of NICS rows: renames `month` to `date` and adds the
+    date_year/date_month/date_day components used by ExploratoryDataAnalysisNICS.
+    """
+    rows = rows.rename(columns={'month': 'date'})
+    return DataTransformer(rows).extract_date_components('date', drop_original=False)
+
+
+def month_hashes(rows, month_column='month'):
+    """
+    Returns one 64-bit content hash per month, independent of the row order within the month.
+    :param rows: DataFrame of raw NICS rows.
+    :return: dict mapping 'YYYY-MM' to the hash as a hex string.
+    """
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    codes, months = pd.factorize(rows[month_column], sort=True)
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(len(months)))
+    # uint64 addition wraps around, which keeps the sum order independent.
+    sums = np.add.reduceat(hashes[order], starts)
+    return {month.strftime('%Y-%m'): f'{value:016x}' for month, value in zip(months, sums)}
+
+
+class NICSStore:
+    """
+    Persisted, incrementally updated copy of the NICS background checks data and its aggregates.
+
+    The NICS file is append-only: every month adds one row per state. update() reads the source,
+    hashes each month and compares the hashes with those of the last run. Rows of new months are
+    prepared and written as a new part file, and the aggregates are extended with the new months
+    only: the (month, state) totals gain new rows, the yearly totals are added to, and the national
+    cumulative sums continue from their last value. When a stored month was revised or removed, the
+    store falls back to a full rebuild.
+
+    `prepare` must only look at the rows it is given (no statistics across months), so that
+    preparing the new months alone gives the same rows as preparing the whole file.
+
+    Every update writes its files under a new generation number and only then replaces the manifest
+    (atomically, with os.replace). The manifest lists the parts and the aggregate generation that
+    make up the store, and files it does not list (left behind by an interrupted update) are ignored
+    and removed by the next update, so a crash never leaves rows counted twice or half written.
+
+    Layout of `store_dir`:
+        manifest.json                       source hash, per-month content hashes, parts and generation
+        rows/part-<generation>.<format>     prepared rows, one part per update that added rows
+        <aggregate>-<generation>.<format>   monthly_state_totals, yearly_totals, cumulative_totals
+
+    Example:
+        store = NICSStore('nics_store', 'nics-firearm-background-checks.csv')
+        store.update()
+        eda = ExploratoryDataAnalysisNICS(store.load())
+    """
+    AGGREGATES = ('monthly_state_totals', 'yearly_totals', 'cumulative_totals')
+
+    def __init__(self, store_dir, source_path, prepare=prepare_nics_rows):
+        """
+        :param store_dir: str, directory of the store. It is created on the first update.
+        :param source_path: str, path to the NICS CSV file.
+        :param prepare: Callable applied to a DataFrame of new raw rows, returning the rows to store.
+        """
+        self.store_dir = store_dir
+        self.source_path = source_path
+        self.prepare = prepare
+        self.manifest_path = os.path.join(store_dir, 'manifest.json')
+        self.rows_dir = os.path.join(store_dir, 'rows')
+
+    def _path(self, name, generation):
+        return os.path.join(self.store_dir, f'{name}-{generation:05d}.{CACHE_FORMAT}')
+
+    def _part_path(self, generation):
+        return os.path.join(self.rows_dir, f'part-{generation:05d}.{CACHE_FORMAT}')
+
+    @staticmethod
+    def _write_frame(frame, path):
+        if CACHE_FORMAT == 'parquet':
+            frame.to_parquet(path)
+        else:
+            frame.to_pickle(path)
+
+    @staticmethod
+    def _read_frame(path, columns=None):
+        if CACHE_FORMAT == 'parquet':
+            return pd.read_parquet(path, columns=columns)
+        frame = pd.read_pickle(path)
+        return frame[columns] if columns is not None else frame
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, encoding='utf-8') as handle:
+            manifest = json.load(handle)
+        # Stores written before parts were listed in the manifest are rebuilt.
+        return manifest if manifest.get('format') == CACHE_FORMAT and 'parts' in manifest else None
+
+    def _write_manifest(self, manifest):
+        temp_path = f'{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle)
+        os.replace(temp_path, self.manifest_path)
+
+    def _current(self):
+        manifest = self._read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"No NICS store in {self.store_dir}; run update() first.")
+        return manifest
+
+    def _part_paths(self, manifest=None):
+        """
+        Returns the part files listed in the manifest, oldest first.
+        """
+        manifest = manifest or self._current()
+        return [self._part_path(generation) for generation in manifest['parts']]
+
+    def _remove_unlisted(self, manifest):
+        """
+        Deletes part, aggregate and temporary files that the manifest does not reference.
+        """
+        keep = set(self._part_paths(manifest)) | {self._path(name, manifest['generation']) for name in self.AGGREGATES}
+        patterns = [os.path.join(self.rows_dir, 'part-*'), os.path.join(self.store_dir, '*.tmp')]
+        # '<aggregate>.<format>' files are left over from stores written before generations were used.
+        patterns += [os.path.join(self.store_dir, f'{name}{separator}*') for name in self.AGGREGATES for separator in '-.']
+        for path in {path for pattern in patterns for path in glob.glob(pattern)} - keep:
+            os.remove(path)
+
+    def _read_source(self):
+        acquisition = DataAcquisition(None, self.source_path)
+        return acquisition.read_csv_cached(self.source_path, dtypes=NICS_DTYPES, date_formats=NICS_DATE_FORMATS)
+
+    def _write_part(self, rows, generation):
+        os.makedirs(self.rows_dir, exist_ok=True)
+        path = self._part_path(generation)
+        rows = rows.reset_index(drop=True)
+        # Parts are written separately, so categories are stored as plain strings and restored by load().
+        categorical = [column for column in rows.columns if isinstance(rows[column].dtype, pd.CategoricalDtype)]
+        self._write_frame(rows.astype({column: str for column in categorical}), path)
+
+    @staticmethod
+    def _count_columns(rows):
+        return [column for column in NICS_COUNT_COLUMNS if column in rows.columns]
+
+    def _aggregate(self, rows):
+        """
+        Computes the (month, state) and (year, state) totals of prepared rows.
+        """
+        columns = self._count_columns(rows)
+        keys = [rows['date'], rows['state'].astype(str)]
+        monthly = rows.groupby(keys, observed=True, sort=True)[columns].sum().astype('float64')
+        monthly.index.names = ['date', 'state']
+        years = monthly.index.get_level_values('date').year.rename('year')
+        yearly = monthly.groupby([years, monthly.index.get_level_values('state')]).sum()
+        return monthly, yearly
+
+    @staticmethod
+    def _cumulative(monthly_state_totals):
+        return monthly_state_totals.groupby(level='date').sum().cumsum()
+
+    def _update_aggregates(self, new_rows, stored_generation, generation):
+        new_monthly, new_yearly = self._aggregate(new_rows)
+        stored_cumulative = self._read_frame(self._path('cumulative_totals', stored_generation))
+        monthly = pd.concat([self._read_frame(self._path('monthly_state_totals', stored_generation)), new_monthly]).sort_index()
+        yearly = self._read_frame(self._path('yearly_totals', stored_generation)).add(new_yearly, fill_value=0).sort_index()
+
+        months = new_monthly.groupby(level='date').sum()
+        if months.index.min() > stored_cumulative.index.max():
+            cumulative = pd.concat([stored_cumulative, months.cumsum() + stored_cumulative.iloc[-1]])
+        else:
+            # A month older than the newest stored one: restart the running sums from the monthly totals.
+            cumulative = self._cumulative(monthly)
+
+        for name, frame in zip(self.AGGREGATES, (monthly, yearly, cumulative)):
+            self._write_frame(frame, self._path(name, generation))
+
+    def rebuild(self):
+        """
+        Rebuilds the store from the whole source file.
+        :return: dict summarising the update, as returned by update().
+        """
+        source = self._read_source()
+        previous = self._read_manifest()
+        generation = previous['generation'] + 1 if previous is not None else 0
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        rows = self.prepare(source)
+        self._write_part(rows, generation)
+        monthly, yearly = self._aggregate(rows)
+        for name, frame in zip(self.AGGREGATES, (monthly, yearly, self._cumulative(monthly))):
+            self._write_frame(frame, self._path(name, generation))
+
+        hashes = month_hashes(source)
+        manifest = {'format': CACHE_FORMAT, 'source_sha256': file_sha256(self.source_path), 'months': hashes,
+                    'rows': len(rows), 'generation': generation, 'parts': [generation]}
+        self._write_manifest(manifest)
+        self._remove_unlisted(manifest)
+        summary = {'mode': 'rebuild', 'new_months': len(hashes), 'new_rows': len(rows), 'rows': len(rows)}
+        print(f"NICS store rebuilt with {len(rows)} rows over {len(hashes)} months.")
+        return summary
+
+    def update(self):
+        """
+        Brings the store up to date with the source file, processing only the rows of new months.
+        Falls back to rebuild() when there is no store yet or when a stored month was revised.
+        :return: dict with the mode ('unchanged', 'incremental' or 'rebuild'), the number of new
+            months and rows, and the total number of stored rows.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return self.rebuild()
+        source_sha256 = file_sha256(self.source_path)
+        if manifest['source_sha256'] == source_sha256:
+            return {'mode': 'unchanged', 'new_months': 0, 'new_rows': 0, 'rows': manifest['rows']}
+
+        source = self._read_source()
+        hashes = month_hashes(source)
+        stored = manifest['months']
+        revised = [month for month, digest in stored.items() if hashes.get(month) != digest]
+        if revised:
+            print(f"NICS store: {len(revised)} stored months changed (e.g. {min(revised)}), rebuilding.")
+            return self.rebuild()
+
+        new_months = sorted(set(hashes) - set(stored))
+        new_rows = self.prepare(source[source['month'].dt.strftime('%Y-%m').isin(new_months)])
+        if len(new_rows):
+            generation = manifest['generation'] + 1
+            self._write_part(new_rows, generation)
+            self._update_aggregates(new_rows, manifest['generation'], generation)
+            manifest.update(generation=generation, parts=manifest['parts'] + [generation])
+
+        manifest.update(source_sha256=source_sha256, months=hashes, rows=manifest['rows'] + len(new_rows))
+        self._write_manifest(manifest)
+        self._remove_unlisted(manifest)
+        print(f"NICS store updated with {len(new_rows)} rows from {len(new_months)} new months.")
+        return {'mode': 'incremental', 'new_months': len(new_months), 'new_rows': len(new_rows), 'rows': manifest['rows']}
+
+    def load(self, columns=None):
+        """
+        Loads the stored rows, sorted by date and state.
+        :param columns: list of str, optional subset of columns to load.
+        :return: DataFrame of the prepared rows, with `state` as a categorical column.
+        """
+        rows = pd.concat([self._read_frame(path, columns) for path in self._part_paths()], ignore_index=True)
+        if 'state' in rows.columns:
+            rows['state'] = rows['state'].astype('category')
+        if {'date', 'state'} <= set(rows.columns):
+            rows = rows.sort_values(['date', 'state'], ignore_index=True)
+        return rows
+
+    def monthly_state_totals(self):
+        """
+        Returns the sums of every count column per (month, state).
+        """
+        return self._read_frame(self._path('monthly_state_totals', self._current()['generation']))
+
+    def yearly_totals(self, column=None):
+        """
+        Returns the sums of every count column per (year, state), or a year x state table of `column`.
+        """
+        totals = self._read_frame(self._path('yearly_totals', self._current()['generation']))
+        return totals if column is None else totals[column].unstack('state')
+
+    def cumulative_totals(self, column=None):
+        """
+        Returns the national running sums of every count column (or of `column`) month by month.
+        """
+        totals = self._read_frame(self._path('cumulative_totals', self._current()['generation']))
+        return totals if column is None else totals[column]
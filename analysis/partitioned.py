@@ -0,0 +1,258 @@
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .data_clean import DataCleaner
+from .lazy_imports import optional_module
+from .plan import copy_on_write_enabled
+
+pa = optional_module('pyarrow')
+
+# Buffers in the shared block start on 64-byte boundaries.
+_ALIGNMENT = 64
+
+_worker_frame = None
+_worker_memory = None
+
+
+def run_cleaner(partition, method, *args, **kwargs):
+    """
+    Runs a DataCleaner method on one partition, e.g.
+    executor.apply(run_cleaner, 'check_for_outliers', 'totals', rows=True).
+    """
+    return getattr(DataCleaner(partition), method)(*args, **kwargs)
+
+
+def _column_buffers(series):
+    """
+    Splits a column into NumPy buffers that can live in shared memory, plus what is needed to
+    rebuild it. Columns that have no fixed-width representation (strings, objects) return
+    (None, (None, None)).
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'codes': series.cat.codes.to_numpy()}, ('category', dtype)
+    if isinstance(series.array, (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        return {'values': values, 'mask': mask}, ('masked', dtype)
+    if isinstance(dtype, pd.ArrowDtype) and dtype.kind in 'biuf':
+        # Arrow-backed numbers (e.g. the NICS counts) travel as values plus a mask like the masked arrays.
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        return {'values': values, 'mask': mask}, ('arrow', dtype)
+    if dtype.kind == 'M' and getattr(dtype, 'tz', None) is None:
+        return {'values': series.to_numpy().view('int64')}, ('datetime', series.to_numpy().dtype)
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        return {'values': series.to_numpy()}, ('numpy', dtype)
+    return None, (None, None)
+
+
+def _rebuild_column(buffers, kind, dtype):
+    if kind == 'category':
+        return pd.Categorical.from_codes(buffers['codes'], dtype=dtype)
+    if kind == 'masked':
+        return dtype.construct_array_type()(buffers['values'], buffers['mask'])
+    if kind == 'arrow':
+        mask = buffers['mask'] if buffers['mask'].any() else None
+        return pd.arrays.ArrowExtensionArray(pa.array(buffers['values'], mask=mask))
+    if kind == 'datetime':
+        return buffers['values'].view(dtype)
+    return buffers['values']
+
+
+def _attach(memory_name, layout, pickled_columns, index_layout, columns):
+    """
+    Maps the shared block and builds a DataFrame whose columns are read-only views into it.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    data = {}
+    for column, (kind, dtype, buffers) in layout.items():
+        views = {}
+        for name, (offset, buffer_dtype, length) in buffers.items():
+            view = np.ndarray(length, dtype=buffer_dtype, buffer=memory.buf, offset=offset)
+            view.flags.writeable = False
+            views[name] = view
+        data[column] = _rebuild_column(views, kind, dtype)
+    data.update(pickled_columns)
+    offset, length = index_layout
+    index = np.ndarray(length, dtype='int64', buffer=memory.buf, offset=offset)
+    index.flags.writeable = False
+    frame = pd.DataFrame({column: data[column] for column in columns}, index=pd.Index(index), copy=False)
+    return memory, frame
+
+
+def _init_worker(*shared):
+    global _worker_memory, _worker_frame
+    _worker_memory, _worker_frame = _attach(*shared)
+
+
+def _run_partition(function, key, start, end, args, kwargs, frame=None):
+    frame = frame if frame is not None else _worker_frame
+    partition = frame.iloc[start:end]
+    if not copy_on_write_enabled():
+        # Without copy-on-write, in-place DataCleaner methods would write into the slice (and the
+        # shared block behind it); give the function a private copy of its rows instead.
+        partition = partition.copy()
+    return key, function(partition, *args, **kwargs)
+
+
+def _release(pool, memory):
+    """
+    Shuts a pool down and unlinks its shared memory block. Holds no reference to the executor, so
+    it can run as the executor's finalizer.
+    """
+    pool.shutdown()
+    memory.close()
+    memory.unlink()
+
+
+class PartitionedExecutor:
+    """
+    Runs a function on every partition of a DataFrame (e.g. one per state) in a process pool.
+
+    The frame is sorted by the key column once, so every partition is a contiguous row range.
+    Fixed-width columns (numbers, nullable integers, datetimes, categorical codes) are copied once
+    into a single shared memory block; every worker maps that block and builds read-only,
+    zero-copy views of it, so a task only ships the function, the key and a (start, end) range
+    instead of a pickled copy of the partition. Columns without a fixed-width layout (strings,
+    objects) are pickled to each worker once, when the pool starts.
+
+    Functions may modify their partition. With pandas copy-on-write (the default from pandas 3.0,
+    or pd.options.mode.copy_on_write = True on pandas 2.x) a partition is a zero-copy slice and a
+    write copies only the columns it touches; without it every task works on a private copy of its
+    rows, so the shared buffers are never written to.
+
+    Partition frames keep the row positions of the original frame as their index, which lets
+    apply(..., rows=True) put row results back in the original order and labels.
+
+    Example:
+        with PartitionedExecutor(nics_df, key='state') as executor:
+            outliers = executor.apply(run_cleaner, 'check_for_outliers', 'totals', rows=True)
+            statistics = executor.apply(describe_columns, ['totals', 'handgun'])
+    """
+    def __init__(self, dataframe, key='state', processes=None):
+        """
+        :param dataframe: DataFrame to partition.
+        :param key: Column to partition by.
+        :param processes: int, number of worker processes. None uses one per CPU; 1 runs every
+            partition in this process without shared memory.
+        """
+        self.key = key
+        self.processes = processes or os.cpu_count() or 1
+        codes, self.keys = pd.factorize(dataframe[key], sort=True)
+        order = np.argsort(codes, kind='stable')
+        self.frame = dataframe.iloc[order].set_axis(pd.Index(order), axis=0)
+        self.original_index = dataframe.index
+        sorted_codes = codes[order]
+        # Rows with a missing key (code -1) sort first and belong to no partition.
+        self.bounds = np.searchsorted(sorted_codes, np.arange(len(self.keys) + 1))
+        self._memory = None
+        self._pool = None
+        self._finalizer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def partitions(self):
+        """
+        Returns (key, start, end) of every partition, largest first so the pool stays busy.
+        """
+        sizes = np.diff(self.bounds)
+        return [(self.keys[i], self.bounds[i], self.bounds[i + 1]) for i in np.argsort(-sizes, kind='stable')]
+
+    def _share(self):
+        """
+        Copies the fixed-width columns and the index into one shared memory block.
+        """
+        buffers, layout, pickled = [], {}, {}
+        for column in self.frame.columns:
+            column_buffers, (kind, dtype) = _column_buffers(self.frame[column])
+            if column_buffers is None:
+                pickled[column] = self.frame[column].array
+                continue
+            layout[column] = (kind, dtype, {})
+            for name, values in column_buffers.items():
+                buffers.append((column, name, np.ascontiguousarray(values)))
+        buffers.append((None, 'index', self.frame.index.to_numpy(dtype='int64')))
+
+        offsets, size = [], 0
+        for _, _, values in buffers:
+            size = -(-size // _ALIGNMENT) * _ALIGNMENT
+            offsets.append(size)
+            size += values.nbytes
+        self._memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        index_layout = None
+        for (column, name, values), offset in zip(buffers, offsets):
+            np.ndarray(values.shape, dtype=values.dtype, buffer=self._memory.buf, offset=offset)[:] = values
+            if column is None:
+                index_layout = (offset, len(values))
+            else:
+                layout[column][2][name] = (offset, values.dtype, len(values))
+        return self._memory.name, layout, pickled, index_layout, list(self.frame.columns)
+
+    def _executor(self):
+        if self._pool is None:
+            initargs = self._share()
+            try:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                                 initargs=initargs)
+            except BaseException:
+                self._memory.close()
+                self._memory.unlink()
+                self._memory = None
+                raise
+            # Releases the block when the executor is garbage collected (or at exit) without close().
+            self._finalizer = weakref.finalize(self, _release, self._pool, self._memory)
+        return self._pool
+
+    def map(self, function, *args, **kwargs):
+        """
+        Runs function(partition, *args, **kwargs) on every partition.
+        :param function: Picklable (module-level) callable taking a partition DataFrame.
+        :return: dict mapping each key to its result, in key order.
+        """
+        if self.processes == 1:
+            results = dict(_run_partition(function, key, start, end, args, kwargs, self.frame)
+                           for key, start, end in self.partitions())
+        else:
+            pool = self._executor()
+            futures = [pool.submit(_run_partition, function, key, start, end, args, kwargs)
+                       for key, start, end in self.partitions()]
+            results = dict(future.result() for future in futures)
+        return {key: results[key] for key in self.keys}
+
+    def apply(self, function, *args, rows=False, **kwargs):
+        """
+        Runs function on every partition and recombines the results.
+        :param rows: bool, whether the function returns rows of its partition (e.g. the outliers of
+            check_for_outliers or a cleaned partition). Row results are concatenated in the order of
+            the original frame and get its index labels back; otherwise DataFrame and Series results
+            are concatenated with the key as the outer index level and other results form a Series
+            indexed by key.
+        """
+        results = self.map(function, *args, **kwargs)
+        if rows:
+            combined = pd.concat(results.values()).sort_index()
+            return combined.set_axis(self.original_index[combined.index.to_numpy()], axis=0)
+        if results and all(isinstance(value, (pd.DataFrame, pd.Series)) for value in results.values()):
+            return pd.concat(results, names=[self.key])
+        return pd.Series(results, name=getattr(function, '__name__', None))
+
+    def close(self):
+        """
+        Shuts the pool down and releases the shared memory block. Executors that are dropped without
+        close() release them when they are garbage collected.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._pool = None
+        self._memory = None
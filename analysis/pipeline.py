@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+
+from .data_clean import DataCleaner
+from .data_transform import DataTransformer
+from .sketches import ColumnSketches
+
+from .lazy_imports import optional_module
+
+pa = optional_module('pyarrow')
+pq = optional_module('pyarrow.parquet')
+
+
+class StreamingStatistics:
+    """
+    Exact per-column statistics accumulated chunk by chunk.
+
+    Keeps a count, a sum and the value counts of every tracked column. Means come from the
+    sums; quantiles are read off the merged value counts with the same linear interpolation as
+    Series.quantile, so they match a full in-memory computation. Memory grows with the number of
+    distinct values per column, which stays small for count data such as NICS.
+    """
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.counts = dict.fromkeys(self.columns, 0)
+        self.sums = dict.fromkeys(self.columns, 0.0)
+        self.value_counts = dict.fromkeys(self.columns)
+
+    def update(self, chunk):
+        """
+        Adds the values of a chunk to the running statistics.
+        :param chunk: DataFrame containing the tracked columns.
+        """
+        for column in self.columns:
+            values = chunk[column].dropna()
+            self.counts[column] += len(values)
+            self.sums[column] += float(values.sum())
+            self._add_counts(column, values.value_counts())
+        return self
+
+    def _add_counts(self, column, counts):
+        previous = self.value_counts[column]
+        self.value_counts[column] = counts if previous is None else previous.add(counts, fill_value=0)
+
+    def merge(self, other):
+        """
+        Merges the statistics of another StreamingStatistics over the same columns into this one.
+        """
+        for column in self.columns:
+            self.counts[column] += other.counts[column]
+            self.sums[column] += other.sums[column]
+            if other.value_counts[column] is not None:
+                self._add_counts(column, other.value_counts[column])
+        return self
+
+    def mean(self, column):
+        count = self.counts[column]
+        return self.sums[column] / count if count else np.nan
+
+    def quantile(self, column, q):
+        counts = self.value_counts[column]
+        if counts is None or counts.empty:
+            return np.nan
+        counts = counts.sort_index()
+        values = counts.index.to_numpy(dtype=float)
+        cumulative = np.cumsum(counts.to_numpy(dtype=np.int64))
+        position = (cumulative[-1] - 1) * q
+        lower_rank, upper_rank = int(np.floor(position)), int(np.ceil(position))
+        lower = values[np.searchsorted(cumulative, lower_rank, side='right')]
+        upper = values[np.searchsorted(cumulative, upper_rank, side='right')]
+        return lower + (upper - lower) * (position - lower_rank)
+
+    def median(self, column):
+        return self.quantile(column, 0.5)
+
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to a Parquet file (one row group per chunk) or to a CSV file.
+
+    The Parquet schema is fixed by the first chunk and later chunks are cast to it, so the
+    columns should have stable dtypes across chunks (e.g. the declared NICS schema).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        if self.parquet and pq is None:
+            raise ImportError("Writing a Parquet sink requires the pyarrow package.")
+        self._writer = None
+        self._schema = None
+        self._header = True
+
+    def write(self, chunk, float_columns=()):
+        """
+        :param float_columns: Columns to write as float64 when the chunk holds them as NumPy integers.
+        """
+        promote = {column: 'float64' for column in float_columns
+                   if column in chunk.columns and isinstance(chunk[column].dtype, np.dtype) and chunk[column].dtype.kind in 'iu'}
+        if promote:
+            chunk = chunk.astype(promote)
+        if self.parquet:
+            table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ChunkedPipeline:
+    """
+    Streams a dataset chunk by chunk through DataCleaner and DataTransformer steps and writes the
+    result incrementally to a Parquet or CSV sink, so peak memory is bounded by the chunk size
+    instead of the dataset size (except for remove_duplicates, see the memory limit below).
+
+    Steps that need global statistics (mean/median fills in handle_missing_values and the IQR
+    fences of flag_outliers) are resolved with extra passes: one pass per such step accumulates
+    StreamingStatistics over the data as it enters that step, so e.g. flag_outliers after a median
+    fill sees the filled values, as it would in memory. A final pass applies every step with its
+    statistics. With approximate=True the statistics passes keep mergeable KLL sketches
+    (sketches.ColumnSketches) instead of exact value counts, which bounds their memory for
+    high-cardinality float columns at the cost of the documented quantile error.
+
+    Memory limit: remove_duplicates works across chunks by remembering a 64-bit hash of every row
+    it has kept, in a Python set of about 70-100 bytes per distinct row. That part of the memory
+    grows with the number of distinct rows, not with the chunk size (about 1 GB per 10M rows); drop
+    the step, or deduplicate on a key subset beforehand, for inputs beyond that. As with
+    DataCleaner.remove_duplicates(hash_keys=True), rows whose hashes collide count as duplicates.
+
+    Integer columns (NumPy int64) that a mean/median fill applies to are written as float64, since
+    a chunk with missing values gets float fills while a chunk without them stays integer.
+
+    Example:
+        acquisition = DataAcquisition(None, 'nics-firearm-background-checks.csv')
+        pipeline = ChunkedPipeline(lambda: acquisition.iter_nics_bgchecks_chunks(50000), 'nics_clean.parquet')
+        pipeline.add_step('remove_duplicates').add_step('handle_missing_values', strategy='median')
+        pipeline.add_step('flag_outliers', column='totals').run()
+    """
+    SUPPORTED_STEPS = ('remove_duplicates', 'handle_missing_values', 'convert_data_types',
+                       'standardize_categorical', 'flag_outliers', 'extract_date_components')
+
+    def __init__(self, chunks, sink_path, approximate=False, sketch_k=200):
+        """
+        :param chunks: Callable returning a fresh iterator of DataFrame chunks. It is called once per pass.
+        :param sink_path: str, output file. A '.parquet' path requires pyarrow; any other path is written as CSV.
+        :param approximate: bool, whether the first pass uses KLL sketches instead of exact value counts.
+        :param sketch_k: int, accuracy parameter of the sketches.
+        """
+        self.chunks = chunks
+        self.sink_path = sink_path
+        self.approximate = approximate
+        self.sketch_k = sketch_k
+        self.steps = []
+        self.statistics = {}
+        self._filled_columns = set()
+
+    def add_step(self, name, **kwargs):
+        """
+        Appends a step. `name` is a DataCleaner/DataTransformer method name (or 'flag_outliers',
+        which adds a boolean '<column>_outlier' column) and `kwargs` are its arguments.
+        :return: The pipeline, so calls can be chained.
+        """
+        if name not in self.SUPPORTED_STEPS:
+            raise ValueError(f"Unsupported step '{name}', expected one of {self.SUPPORTED_STEPS}")
+        self.steps.append((name, kwargs))
+        return self
+
+    @staticmethod
+    def _needs_statistics(name, kwargs):
+        if name == 'flag_outliers':
+            return True
+        return name == 'handle_missing_values' and kwargs.get('strategy', 'mean') in ('mean', 'median')
+
+    def _statistics_columns(self, chunk, name, kwargs):
+        if name == 'flag_outliers':
+            return [kwargs['column']]
+        column = kwargs.get('specific_column')
+        return [column] if column else [c for c in chunk.columns if chunk[c].dtype.kind in 'biufc']
+
+    @staticmethod
+    def _fill_values(statistics, kwargs):
+        columns = [kwargs['specific_column']] if kwargs.get('specific_column') else statistics.columns
+        if kwargs.get('strategy', 'mean') == 'mean':
+            return {column: statistics.mean(column) for column in columns if column in statistics.counts}
+        return {column: statistics.median(column) for column in columns if column in statistics.counts}
+
+    def _apply_step(self, chunk, index, seen_rows):
+        name, kwargs = self.steps[index]
+        if name == 'remove_duplicates':
+            hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            keep = ~pd.Series(hashes).duplicated().to_numpy()
+            keep &= np.fromiter((h not in seen_rows for h in hashes.tolist()), dtype=bool, count=len(hashes))
+            seen_rows.update(hashes[keep].tolist())
+            return chunk[keep]
+        if name == 'flag_outliers':
+            column = kwargs['column']
+            statistics = self.statistics[index]
+            cleaner = DataCleaner(chunk)
+            bounds = cleaner.outlier_bounds(column, (statistics.quantile(column, 0.25), statistics.quantile(column, 0.75)))
+            chunk[f'{column}_outlier'] = cleaner.outlier_flags(column, bounds)
+            return chunk
+        if name == 'extract_date_components':
+            return DataTransformer(chunk).extract_date_components(**kwargs)
+        cleaner = DataCleaner(chunk)
+        if name == 'handle_missing_values' and self._needs_statistics(name, kwargs):
+            self._filled_columns.update(self._statistics_columns(chunk, name, kwargs))
+            return cleaner.handle_missing_values(fill_values=self._fill_values(self.statistics[index], kwargs), **kwargs)
+        return getattr(cleaner, name)(**kwargs)
+
+    def compute_statistics(self):
+        """
+        Statistics passes: one pass per step that needs global statistics, over the data as it
+        enters that step (i.e. after the earlier steps, with their own statistics, have been applied).
+        :return: dict mapping the index of each such step to its StreamingStatistics (ColumnSketches
+            if approximate); empty when no step needs global statistics.
+        """
+        self.statistics = {}
+        self._filled_columns = set()
+        for index, (name, kwargs) in enumerate(self.steps):
+            if not self._needs_statistics(name, kwargs):
+                continue
+            statistics = None
+            seen_rows = set()
+            for chunk in self.chunks():
+                for previous in range(index):
+                    chunk = self._apply_step(chunk, previous, seen_rows)
+                if statistics is None:
+                    columns = self._statistics_columns(chunk, name, kwargs)
+                    if self.approximate:
+                        statistics = ColumnSketches(columns, self.sketch_k)
+                    else:
+                        statistics = StreamingStatistics(columns)
+                statistics.update(chunk)
+            self.statistics[index] = statistics
+        return self.statistics
+
+    def run(self):
+        """
+        Runs the statistics passes and a final pass that writes the processed chunks to the sink.
+        :return: dict with the number of chunks, input rows and output rows.
+        """
+        self.compute_statistics()
+        self._filled_columns = set()
+        seen_rows = set()
+        summary = {'chunks': 0, 'rows_in': 0, 'rows_out': 0}
+        writer = ChunkWriter(self.sink_path)
+        try:
+            for chunk in self.chunks():
+                summary['rows_in'] += len(chunk)
+                for index in range(len(self.steps)):
+                    chunk = self._apply_step(chunk, index, seen_rows)
+                # A column filled with a float mean or median in one chunk can still be integer in a
+                # chunk that had nothing to fill; write all of them as float so the sink schema holds.
+                writer.write(chunk, float_columns=self._filled_columns)
+                summary['chunks'] += 1
+                summary['rows_out'] += len(chunk)
+        finally:
+            writer.close()
+        print(f"Pipeline wrote {summary['rows_out']} of {summary['rows_in']} rows in {summary['chunks']} chunks to {self.sink_path}.")
+        return summary
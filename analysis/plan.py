@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+from .data_clean import DataCleaner
+from .data_transform import DataTransformer
+
+TRANSFORMER_STEPS = ('extract_date_components',)
+
+FILL_STRATEGIES = ('mean', 'median', 'custom')
+
+
+def copy_on_write_enabled():
+    """
+    Returns whether pandas copy-on-write is active: always from pandas 3.0, and on pandas 2.x when
+    pd.options.mode.copy_on_write is True.
+    """
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except KeyError:
+        return False
+
+
+def _kind(name, kwargs):
+    if name == 'remove_duplicates' or (name == 'handle_missing_values' and kwargs.get('strategy', 'mean') == 'drop'):
+        return 'filter'
+    if name == 'handle_missing_values' and kwargs.get('strategy', 'mean') in FILL_STRATEGIES:
+        return 'fill'
+    return 'call'
+
+
+def _fill_columns(kwargs):
+    column = kwargs.get('specific_column')
+    return {column} if column else None
+
+
+class CleaningPlan:
+    """
+    Immutable, lazily executed chain of DataCleaner and DataTransformer steps.
+
+    Every step method returns a new plan and leaves the frame untouched; execute() runs the steps
+    once on a private working frame and returns it. With pandas copy-on-write enabled
+    (pd.options.mode.copy_on_write = True, the default from pandas 3.0) the working frame starts
+    as a shallow copy and a step only copies the columns it modifies, so the caller's frame is
+    never written to and no step needs a defensive .copy(). Without copy-on-write the working
+    frame starts as one deep copy.
+
+    Consecutive steps are fused where the result is the same:
+        - row filters (remove_duplicates followed by handle_missing_values(strategy='drop')) build
+          one boolean mask and select the rows once;
+        - mean/median/custom fills of disjoint columns are computed on the same frame and applied
+          with a single fillna.
+
+    Example:
+        cleaned = (CleaningPlan(nics_df)
+                   .remove_duplicates()
+                   .handle_missing_values('median', specific_column='permit')
+                   .handle_missing_values('custom', specific_column='admin', custom_fill_value=0)
+                   .extract_date_components('month', drop_original=False)
+                   .execute())
+    """
+    def __init__(self, dataframe, steps=()):
+        """
+        :param dataframe: DataFrame the plan starts from. It is never modified.
+        :param steps: Tuple of (method name, kwargs) pairs.
+        """
+        self.dataframe = dataframe
+        self.steps = tuple(steps)
+
+    def _add(self, name, kwargs):
+        return CleaningPlan(self.dataframe, self.steps + ((name, kwargs),))
+
+    def remove_duplicates(self, subset=None, hash_keys=False):
+        return self._add('remove_duplicates', {'subset': subset, 'hash_keys': hash_keys})
+
+    def handle_missing_values(self, strategy='mean', specific_column=None, custom_fill_value=None, fill_values=None):
+        return self._add('handle_missing_values', {'strategy': strategy, 'specific_column': specific_column,
+                                                   'custom_fill_value': custom_fill_value, 'fill_values': fill_values})
+
+    def convert_data_types(self, column, new_type):
+        return self._add('convert_data_types', {'column': column, 'new_type': new_type})
+
+    def standardize_categorical(self, column):
+        return self._add('standardize_categorical', {'column': column})
+
+    def encode_categorical(self, column, method='onehot'):
+        return self._add('encode_categorical', {'column': column, 'method': method})
+
+    def flag_outliers(self, column):
+        """
+        Adds a boolean '<column>_outlier' column marking values outside the IQR fences, as in ChunkedPipeline.
+        """
+        return self._add('flag_outliers', {'column': column})
+
+    def extract_date_components(self, date_column, drop_original=True, date_format=None, cache=True):
+        return self._add('extract_date_components', {'date_column': date_column, 'drop_original': drop_original,
+                                                     'date_format': date_format, 'cache': cache})
+
+    def stages(self):
+        """
+        Groups the steps into the stages execute() runs.
+        :return: List of (kind, steps) with kind 'filter', 'fill' or 'call'.
+        """
+        stages = []
+        for name, kwargs in self.steps:
+            kind = _kind(name, kwargs)
+            if stages and kind != 'call' and stages[-1][0] == kind and self._fuses(stages[-1][1], name, kwargs):
+                stages[-1][1].append((name, kwargs))
+            else:
+                stages.append((kind, [(name, kwargs)]))
+        return stages
+
+    @staticmethod
+    def _fuses(stage, name, kwargs):
+        if name == 'remove_duplicates':
+            # Duplicates depend on which rows are left, so deduplication can only open a filter stage.
+            return False
+        if name == 'handle_missing_values' and kwargs.get('strategy', 'mean') in FILL_STRATEGIES:
+            columns = _fill_columns(kwargs)
+            for _, previous in stage:
+                other = _fill_columns(previous)
+                if columns is None or other is None or columns & other:
+                    return False
+        return True
+
+    def explain(self):
+        """
+        Returns a readable description of the fused stages.
+        """
+        return '\n'.join(f"{i}: {kind} [{', '.join(name for name, _ in steps)}]"
+                         for i, (kind, steps) in enumerate(self.stages()))
+
+    @staticmethod
+    def _filter(work, steps):
+        keep = pd.Series(True, index=work.index)
+        for name, kwargs in steps:
+            if name == 'remove_duplicates':
+                keys = work if kwargs['subset'] is None else work[kwargs['subset']]
+                if kwargs['hash_keys']:
+                    keep &= ~pd.util.hash_pandas_object(keys, index=False).duplicated().to_numpy()
+                else:
+                    keep &= ~keys.duplicated()
+            else:
+                columns = [kwargs['specific_column']] if kwargs['specific_column'] else list(work.columns)
+                keep &= work[columns].notna().all(axis=1)
+        return work if keep.all() else work.take(np.flatnonzero(keep.to_numpy()))
+
+    @staticmethod
+    def _fill(work, steps):
+        cleaner = DataCleaner(work)
+        fills = {}
+        for _, kwargs in steps:
+            columns = [kwargs['specific_column']] if kwargs['specific_column'] else list(work.columns)
+            fills.update(cleaner._fills(kwargs['strategy'], columns, kwargs['custom_fill_value'], kwargs['fill_values']))
+        if fills:
+            work.fillna(fills, inplace=True)
+        return work
+
+    @staticmethod
+    def _call(work, name, kwargs):
+        if name in TRANSFORMER_STEPS:
+            return getattr(DataTransformer(work), name)(**kwargs)
+        if name == 'flag_outliers':
+            work[f"{kwargs['column']}_outlier"] = DataCleaner(work).outlier_flags(kwargs['column'])
+            return work
+        return getattr(DataCleaner(work), name)(**kwargs)
+
+    def execute(self):
+        """
+        Runs the plan.
+        :return: New DataFrame; the plan's frame is left as it was.
+        """
+        work = self.dataframe.copy(deep=not copy_on_write_enabled())
+        for kind, steps in self.stages():
+            if kind == 'filter':
+                work = self._filter(work, steps)
+            elif kind == 'fill':
+                work = self._fill(work, steps)
+            else:
+                work = self._call(work, *steps[0])
+        return work
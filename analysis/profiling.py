@@ -0,0 +1,90 @@
+import functools
+import inspect
+import logging
+import os
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Instrumentation is off unless enabled here or with ANALYSIS_PROFILE=1 in the environment; a disabled
+# wrapper costs one global lookup per call.
+_enabled = os.environ.get('ANALYSIS_PROFILE', '0') not in ('', '0')
+_records = None
+
+
+def enable_profiling(collect=False):
+    """
+    Turns per-call logging of instrumented methods on.
+    :param collect: bool, whether to also keep every call record, returned by profiling_records().
+    """
+    global _enabled, _records
+    _enabled = True
+    _records = [] if collect else None
+
+
+def disable_profiling():
+    global _enabled, _records
+    _enabled = False
+    _records = None
+
+
+def profiling_records():
+    """
+    Returns the call records collected since enable_profiling(collect=True), as a DataFrame with the
+    method, the wall time in seconds and the rows/columns of the input and output frames.
+    """
+    return pd.DataFrame(_records or [], columns=['method', 'seconds', 'rows_in', 'columns_in', 'rows_out', 'columns_out'])
+
+
+def _shape(value):
+    if isinstance(value, pd.DataFrame):
+        return value.shape
+    if isinstance(value, pd.Series):
+        return len(value), 1
+    return None, None
+
+
+def _input_frame(args):
+    """
+    Finds the frame a call works on: the `df` of the instance, else the first DataFrame argument.
+    """
+    if args and isinstance(getattr(args[0], 'df', None), (pd.DataFrame, pd.Series)):
+        return args[0].df
+    return next((arg for arg in args if isinstance(arg, (pd.DataFrame, pd.Series))), None)
+
+
+def profiled(function, name=None):
+    """
+    Wraps a function so that, while profiling is enabled, every call is logged at INFO level with its
+    wall time and the sizes of the frame it works on and of the frame it returns.
+    """
+    name = name or function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+        rows_in, columns_in = _shape(_input_frame(args))
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        rows_out, columns_out = _shape(result)
+        logger.info("%s: %.2f ms, in %sx%s, out %sx%s", name, seconds * 1000, rows_in, columns_in, rows_out, columns_out)
+        if _records is not None:
+            _records.append({'method': name, 'seconds': seconds, 'rows_in': rows_in, 'columns_in': columns_in,
+                             'rows_out': rows_out, 'columns_out': columns_out})
+        return result
+    return wrapper
+
+
+def profile_methods(cls):
+    """
+    Class decorator applying profiled() to every public method defined on the class. Generator
+    methods are timed up to the creation of the generator only.
+    """
+    for attribute, value in list(vars(cls).items()):
+        if not attribute.startswith('_') and inspect.isfunction(value):
+            setattr(cls, attribute, profiled(value, f'{cls.__name__}.{attribute}'))
+    return cls
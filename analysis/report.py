@@ -0,0 +1,113 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .exploratory import ExploratoryDataAnalysis
+
+# Methods that need a polar Axes.
+POLAR_METHODS = {'plot_radial_chart'}
+
+# Figure-level seaborn plots that create their own figure and cannot draw on a given Axes.
+FIGURE_LEVEL_METHODS = {'pairplot_relationships'}
+
+_worker_analysis = None
+
+
+class PlotSpec:
+    """
+    Describes one figure of a batch report.
+
+    Attributes:
+        method (str): Name of the plotting method of the analysis class, e.g. 'heatmap_for_year_and_state'.
+        args (tuple): Positional arguments of the method.
+        kwargs (dict): Keyword arguments of the method.
+        name (str): Base file name of the figure; defaults to the method name.
+        figsize (tuple): Figure size in inches.
+    """
+    def __init__(self, method, *args, name=None, figsize=(10, 6), **kwargs):
+        if method in FIGURE_LEVEL_METHODS:
+            raise ValueError(f"'{method}' draws a figure-level seaborn plot and cannot be rendered in a batch report.")
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.name = name or method
+        self.figsize = figsize
+
+    def __repr__(self):
+        return f"PlotSpec({self.method!r}, name={self.name!r})"
+
+
+def _init_worker(analysis_class, dataframe):
+    global _worker_analysis
+    _worker_analysis = analysis_class(dataframe)
+
+
+def _render(spec, output_dir, formats, dpi, analysis=None):
+    """
+    Draws one spec onto a fresh Agg figure and saves it in every requested format.
+    :return: dict with the file paths and the plot and save times of the figure.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    analysis = analysis if analysis is not None else _worker_analysis
+    figure = Figure(figsize=spec.figsize)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(projection='polar' if spec.method in POLAR_METHODS else None)
+
+    start = time.perf_counter()
+    getattr(analysis, spec.method)(*spec.args, ax=ax, **spec.kwargs)
+    plot_seconds = time.perf_counter() - start
+
+    paths = []
+    start = time.perf_counter()
+    for extension in formats:
+        path = os.path.join(output_dir, f'{spec.name}.{extension}')
+        figure.savefig(path, dpi=dpi, bbox_inches='tight')
+        paths.append(path)
+    save_seconds = time.perf_counter() - start
+    return {'name': spec.name, 'method': spec.method, 'plot_seconds': plot_seconds,
+            'save_seconds': save_seconds, 'total_seconds': plot_seconds + save_seconds, 'files': paths}
+
+
+def render_report(dataframe, specs, output_dir, analysis_class=ExploratoryDataAnalysis, formats=('png',),
+                  processes=None, dpi=100):
+    """
+    Renders a batch of plots headlessly and writes them to files.
+
+    Every figure is an explicit matplotlib Figure with an Agg canvas, so nothing depends on the
+    global pyplot state or on a display, and nothing blocks on plt.show(). Independent figures are
+    spread over a process pool; each worker builds the analysis object once and reuses it (and any
+    aggregates it caches) for all the figures it renders.
+
+    :param dataframe: DataFrame to analyse.
+    :param specs: list of PlotSpec.
+    :param output_dir: str, directory the figures are written to.
+    :param analysis_class: ExploratoryDataAnalysis or ExploratoryDataAnalysisNICS.
+    :param formats: Iterable of file extensions, e.g. ('png', 'svg').
+    :param processes: int, number of worker processes. None uses one per CPU; 1 renders in this process.
+    :param dpi: int, resolution of raster formats.
+    :return: DataFrame with one row per figure: plot, save and total render time and the written files,
+        sorted with the most expensive figure first.
+    :raises ValueError: If a spec names a method the analysis class does not have, before anything is rendered.
+    """
+    missing = [spec.method for spec in specs if not callable(getattr(analysis_class, spec.method, None))]
+    if missing:
+        raise ValueError(f"{analysis_class.__name__} has no plotting method {', '.join(map(repr, missing))}.")
+    os.makedirs(output_dir, exist_ok=True)
+    formats = tuple(formats)
+    if processes == 1 or len(specs) <= 1:
+        analysis = analysis_class(dataframe)
+        results = [_render(spec, output_dir, formats, dpi, analysis) for spec in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(analysis_class, dataframe)) as executor:
+            futures = [executor.submit(_render, spec, output_dir, formats, dpi) for spec in specs]
+            results = [future.result() for future in futures]
+
+    timings = pd.DataFrame(results, columns=['name', 'method', 'plot_seconds', 'save_seconds', 'total_seconds', 'files'])
+    timings = timings.sort_values('total_seconds', ascending=False, ignore_index=True)
+    print(f"Rendered {len(timings)} figures to {output_dir} in {timings['total_seconds'].sum():.2f} s of render time.")
+    return timings
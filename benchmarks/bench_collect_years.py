@@ -0,0 +1,95 @@
+"""
+Benchmark of the multi-year accumulation in GunViolenceDataCollector.collect_data_for_years.
+
+Pages are synthetic (no network), so the timings only measure how the yearly frames are combined.
+The previous implementation, which called pd.concat inside the loop, is reproduced for comparison.
+
+The scraped text columns are held as object arrays by default, as pandas before 3.0 does. With
+pandas 3 and pyarrow they are Arrow strings (--strings default), whose concat appends chunks
+without copying, so the old loop's quadratic copying barely shows there.
+
+Usage:
+    python benchmarks/bench_collect_years.py --years 12 --pages 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analysis.gvascrape import GunViolenceDataCollector
+
+HEADERS = ['Incident ID', 'Incident Date', 'State', 'City Or County', 'Address', '# Killed', '# Injured',
+           'Operations', 'View Incident Link', 'View Source Link']
+
+
+class SyntheticCollector(GunViolenceDataCollector):
+    """
+    Collector that serves canned pages instead of requesting them.
+    """
+    def __init__(self, pages_per_year, rows_per_page=25):
+        super().__init__('https://www.gunviolencearchive.org')
+        self.pages_per_year = pages_per_year
+        self.rows_per_page = rows_per_page
+
+    def collect_pagination_urls(self, year):
+        return [f"{self.base_url}/reports/total-number-of-incidents?page={i}&year={year}" for i in range(self.pages_per_year)]
+
+    def scrape_page(self, url):
+        page = int(url.split('page=')[-1].split('&')[0])
+        rows = []
+        for i in range(self.rows_per_page):
+            incident_id = str(page * self.rows_per_page + i)
+            rows.append([incident_id, 'January 1, 2020', 'Ohio', 'Akron', '1 Main St', '0', '1', '',
+                         f'/incident/{incident_id}', 'https://news.example.com/'])
+        return HEADERS, rows
+
+
+def concat_in_loop(collector, start_year, end_year):
+    """
+    The previous accumulation: every year is appended to the growing frame with its own pd.concat.
+    :return: Tuple of (frame, list of the seconds spent in each year's concat).
+    """
+    all_years_df = pd.DataFrame()
+    step_times = []
+    for year in range(start_year, end_year + 1):
+        year_df = collector.scrape_data(year)
+        start = time.perf_counter()
+        all_years_df = pd.concat([all_years_df, year_df])
+        step_times.append(time.perf_counter() - start)
+    return all_years_df, step_times
+
+
+def run(years, pages, strings='object'):
+    collector = SyntheticCollector(pages)
+    year_df = collector.scrape_data(2000)
+    if strings == 'object':
+        year_df = year_df.astype(object)
+    print(f"{len(year_df)} rows per year")
+    # Scraping itself is identical in both paths, so every year's frame is built up front to isolate
+    # the accumulation cost. Each year gets its own incident IDs, as a real crawl would.
+    frames = {2000 + n: year_df.assign(**{'Incident ID': year_df['Incident ID'] + f'-{n}'}) for n in range(years)}
+    collector.scrape_data = frames.__getitem__
+
+    # One run of the old loop, timing each concat as the accumulated frame grows: the cost of year n
+    # rises with the n - 1 years already copied, so the total is quadratic.
+    _, step_times = concat_in_loop(collector, 2000, 2000 + years - 1)
+    print(f"{'years':>5} {'rows held':>10} {'loop concat s (year n)':>23} {'loop concat s/yr':>17} {'single concat s/yr':>19}")
+    for n in range(1, years + 1):
+        start = time.perf_counter()
+        collector.collect_data_for_years(2000, 2000 + n - 1)
+        single_time = time.perf_counter() - start
+        print(f"{n:>5} {n * len(year_df):>10} {step_times[n - 1]:>23.4f} {sum(step_times[:n]) / n:>17.4f} {single_time / n:>19.4f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=12)
+    parser.add_argument('--pages', type=int, default=400)
+    parser.add_argument('--strings', choices=['object', 'default'], default='object',
+                        help="dtype of the text columns: object arrays, or the pandas default (Arrow strings on pandas 3)")
+    args = parser.parse_args()
+    run(args.years, args.pages, args.strings)
@@ -0,0 +1,78 @@
+"""
+Benchmark of MonthlyStatePanel against an ad-hoc merge of the NICS and incident frames.
+
+Both datasets are synthetic: one NICS row per state and month and randomly dated incidents in the
+IncidentStore layout. The baseline aggregates incidents with a groupby, merges them onto the NICS
+rows and correlates every NICS column with the incident count through DataFrame.corrwith.
+
+Usage:
+    python benchmarks/bench_correlation.py --incidents 2000000 --queries 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analysis.correlation import MonthlyStatePanel
+from analysis.data_acquisition import NICS_COUNT_COLUMNS
+
+
+def make_data(incidents, states=55, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f'State {i}' for i in range(states)]
+    months = pd.date_range('1998-11-01', '2024-12-01', freq='MS')
+    nics = pd.DataFrame({'month': np.repeat(months, states), 'state': np.tile(names, len(months))})
+    for column in NICS_COUNT_COLUMNS:
+        nics[column] = rng.negative_binomial(2, 0.0005, len(nics))
+    dates = pd.Timestamp('2014-01-01') + pd.to_timedelta(rng.integers(0, 3650, incidents), unit='D')
+    incident_frame = pd.DataFrame({'date': dates, 'state': rng.choice(names, incidents),
+                                   'n_killed': rng.integers(0, 4, incidents), 'n_injured': rng.integers(0, 6, incidents)})
+    return nics, incident_frame
+
+
+def merge_and_correlate(nics, incidents):
+    counts = incidents.groupby([incidents['date'].dt.to_period('M').dt.to_timestamp(), 'state']).size()
+    counts = counts.rename('incidents').rename_axis(['month', 'state']).reset_index()
+    start, end = counts['month'].min(), counts['month'].max()
+    merged = nics[(nics['month'] >= start) & (nics['month'] <= end)].merge(counts, on=['month', 'state'], how='left')
+    merged['incidents'] = merged['incidents'].fillna(0)
+    return merged[NICS_COUNT_COLUMNS].corrwith(merged['incidents'])
+
+
+def run(incidents, queries):
+    nics, incident_frame = make_data(incidents)
+    print(f"{len(nics)} NICS rows, {incidents} incidents")
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        expected = merge_and_correlate(nics, incident_frame)
+    baseline = (time.perf_counter() - start) / queries
+    print(f"merge + corrwith: {baseline * 1000:.1f} ms per query")
+
+    start = time.perf_counter()
+    panel = MonthlyStatePanel.build(nics, incident_frame)
+    print(f"panel build: {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    result = panel.correlations()['incidents']
+    print(f"first correlation query: {(time.perf_counter() - start) * 1000:.1f} ms")
+    assert np.allclose(result.to_numpy(), expected.to_numpy())
+    start = time.perf_counter()
+    panel.cross_correlations(max_lag=12)
+    print(f"cross-correlations at 25 lags: {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    for _ in range(queries):
+        panel.correlations()
+    print(f"repeated query: {(time.perf_counter() - start) / queries * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--incidents', type=int, default=2000000)
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+    run(args.incidents, args.queries)
@@ -0,0 +1,71 @@
+"""
+Import-time check of the analysis package.
+
+Imports each module in a fresh interpreter with `python -X importtime`, reports the cumulative
+import time of the module and of the heavy third-party packages it pulled in, and fails (exit
+status 1) when a module loads a package it should only load lazily or exceeds its time budget.
+Plotting, scraping and Parquet libraries must not be loaded by any import; they are imported on
+first use of a plotting, scraping or Parquet method. Packages that `import pandas` loads by itself
+(pandas 2.x imports pyarrow when it is installed) are not counted against the package.
+
+Usage:
+    python benchmarks/bench_import_time.py --repeat 5 --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+MODULES = ['analysis', 'analysis.data_acquisition', 'analysis.data_clean', 'analysis.data_transform',
+           'analysis.pipeline', 'analysis.plan', 'analysis.exploratory', 'analysis.report', 'analysis.gvascrape',
+           'analysis.incident_store', 'analysis.nics_store', 'analysis.correlation', 'analysis.partitioned']
+
+LAZY_PACKAGES = ['matplotlib', 'seaborn', 'scipy', 'requests', 'bs4', 'lxml', 'pyarrow']
+
+
+def import_times(module):
+    """
+    Imports `module` in a fresh interpreter.
+    :return: dict mapping every top-level package and `module` itself to its cumulative import time in ms.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        name = name.strip()
+        if name == module or '.' not in name:
+            times[name] = max(times.get(name, 0), int(cumulative) / 1000)
+    return times
+
+
+def run(repeat, budget_ms):
+    failures = []
+    baseline = set(import_times('pandas'))
+    print(f"{'module':<28} {'import ms':>10}  lazily loaded packages that were imported")
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(repeat)]
+        best = min(times.get(module, 0.0) for times in runs)
+        loaded = sorted({package for times in runs for package in LAZY_PACKAGES if package in times} - baseline)
+        print(f"{module:<28} {best:>10.1f}  {', '.join(loaded) or '-'}")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)}")
+        if best > budget_ms:
+            failures.append(f"{module} takes {best:.0f} ms to import (budget {budget_ms} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=1500.0, help='largest allowed import time of one module')
+    args = parser.parse_args()
+    sys.exit(0 if run(args.repeat, args.budget_ms) else 1)
@@ -0,0 +1,97 @@
+"""
+Benchmark of IncidentStore lookups against boolean-mask filtering of the flat scraped frame.
+
+Incidents are synthetic and laid out like GunViolenceDataCollector output (string report dates, a
+full incident link per row). The mask baseline filters a frame whose dates were already parsed, so
+the comparison measures the lookups and not the date parsing.
+
+Usage:
+    python benchmarks/bench_incident_store.py --rows 1000000 --queries 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analysis.incident_store import GVA_DATE_FORMAT, IncidentStore
+
+BASE_URL = 'https://www.gunviolencearchive.org'
+STATES = ['Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut', 'Delaware',
+          'Florida', 'Georgia', 'Illinois', 'Indiana', 'Louisiana', 'Michigan', 'New York', 'Ohio',
+          'Pennsylvania', 'Tennessee', 'Texas', 'Washington']
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(rows) + 1000000
+    dates = pd.Timestamp('2014-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    return pd.DataFrame({
+        'Incident ID': ids.astype(str),
+        'Incident Date': dates.strftime(GVA_DATE_FORMAT),
+        'State': rng.choice(STATES, rows),
+        'City Or County': np.char.add('City ', rng.integers(0, 2000, rows).astype(str)),
+        'Address': np.char.add(rng.integers(1, 9999, rows).astype(str), ' Main St'),
+        '# Killed': rng.integers(0, 4, rows).astype(str),
+        '# Injured': rng.integers(0, 6, rows).astype(str),
+        'View Incident Link': BASE_URL + '/incident/' + pd.Series(ids.astype(str)),
+        'View Source Link': 'https://news.example.com/story-' + pd.Series(ids.astype(str)),
+    })
+
+
+def make_queries(count, seed=1):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp('2014-01-01') + pd.to_timedelta(rng.integers(0, 3600, count), unit='D')
+    return [(start, start + pd.Timedelta(days=int(days)), state, f'City {city}')
+            for start, days, state, city in zip(starts, rng.integers(1, 60, count),
+                                                rng.choice(STATES, count), rng.integers(0, 2000, count))]
+
+
+def timed(function, queries):
+    start = time.perf_counter()
+    sizes = [len(function(*query)) for query in queries]
+    return time.perf_counter() - start, sizes
+
+
+def run(rows, queries):
+    raw = make_frame(rows)
+    flat = raw.assign(**{'Incident Date': pd.to_datetime(raw['Incident Date'], format=GVA_DATE_FORMAT)})
+
+    start = time.perf_counter()
+    store = IncidentStore()
+    store.insert(raw)
+    print(f"insert of {rows} rows: {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    duplicates = store.insert(raw.sample(frac=0.1, random_state=0))
+    print(f"re-insert of 10% duplicates: {time.perf_counter() - start:.2f} s, {duplicates} new incidents")
+    print(f"memory: flat {raw.memory_usage(deep=True).sum() / 1e6:.0f} MB, "
+          f"store {store.df.memory_usage(deep=True).sum() / 1e6:.0f} MB")
+
+    dates, states, cities = flat['Incident Date'], flat['State'], flat['City Or County']
+    cases = [
+        ("date range", lambda s, e, st, c: flat[(dates >= s) & (dates <= e)],
+         lambda s, e, st, c: store.query(s, e)),
+        ("state + date range", lambda s, e, st, c: flat[(states == st) & (dates >= s) & (dates <= e)],
+         lambda s, e, st, c: store.query(s, e, state=st)),
+        ("city", lambda s, e, st, c: flat[cities == c],
+         lambda s, e, st, c: store.query(city=c)),
+    ]
+    workload = make_queries(queries)
+    print(f"{'case':>20} {'mask s':>9} {'store s':>9} {'speedup':>8}")
+    for name, mask, indexed in cases:
+        mask_time, expected = timed(mask, workload)
+        store_time, result = timed(indexed, workload)
+        assert expected == result, name
+        print(f"{name:>20} {mask_time:>9.3f} {store_time:>9.3f} {mask_time / store_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    run(args.rows, args.queries)
@@ -0,0 +1,68 @@
+"""
+Benchmark of PartitionedExecutor on synthetic multi-state, multi-year NICS-like data.
+
+Runs a per-state outlier check and per-state column statistics sequentially (a groupby loop in
+this process) and in process pools of increasing size. Speedups need as many idle cores as
+workers; on a single core the pools only add their start-up cost.
+
+Usage:
+    python benchmarks/bench_partitioned.py --rows 2000000 --processes 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analysis.data_acquisition import NICS_COUNT_COLUMNS
+from analysis.data_clean import DataCleaner
+from analysis.exploratory import describe_columns
+from analysis.partitioned import PartitionedExecutor, run_cleaner
+
+
+def make_frame(rows, states=55, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {'state': pd.Categorical.from_codes(rng.integers(0, states, rows), [f'State {i}' for i in range(states)]),
+            'date': pd.Timestamp('1998-11-01') + pd.to_timedelta(rng.integers(0, 9000, rows), unit='D')}
+    for column in NICS_COUNT_COLUMNS:
+        data[column] = pd.array(rng.negative_binomial(2, 0.0005, rows), dtype='UInt32')
+    return pd.DataFrame(data)
+
+
+def sequential(df, function, *args):
+    return {state: function(group, *args) for state, group in df.groupby('state', observed=True)}
+
+
+def run(rows, processes):
+    df = make_frame(rows)
+    print(f"frame: {rows} rows, {df.memory_usage(deep=True).sum() / 1e6:.0f} MB, {os.cpu_count()} CPUs")
+    cases = [
+        ("outliers per state", lambda g: DataCleaner(g).check_for_outliers('totals'),
+         (run_cleaner, 'check_for_outliers', 'totals')),
+        ("statistics per state", lambda g: describe_columns(g, NICS_COUNT_COLUMNS),
+         (describe_columns, NICS_COUNT_COLUMNS)),
+    ]
+    for name, function, task in cases:
+        start = time.perf_counter()
+        sequential(df, function)
+        baseline = time.perf_counter() - start
+        print(f"{name}: groupby loop {baseline:.2f} s")
+        for count in processes:
+            start = time.perf_counter()
+            with PartitionedExecutor(df, 'state', processes=count) as executor:
+                setup = time.perf_counter() - start
+                executor.apply(*task)
+            total = time.perf_counter() - start
+            print(f"    {count:>2} processes: {total:.2f} s (setup {setup:.2f} s), {baseline / total:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    run(args.rows, args.processes)
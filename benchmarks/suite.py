@@ -0,0 +1,294 @@
+"""
+Benchmark suite of the public analysis methods on the bundled NICS data and scaled-up copies.
+
+Every case times one public method of DataAcquisition, DataCleaner, DataTransformer or
+ExploratoryDataAnalysisNICS on the NICS file scaled by each factor (rows repeated with the
+states renamed, so copies are not duplicates of each other). load_gun_violence_data reads a
+synthetic scraper-shaped incident file with as many rows as the scaled NICS file. The plotting
+methods are not covered: their cost is dominated by matplotlib rendering. Each (case, scale) runs in a fresh
+process and reports the best wall time over --repeat runs, the peak RSS of the process and its
+growth during the runs, and the peak of the memory allocated by Python and NumPy (tracemalloc, in
+an extra run). Results are appended to a JSON history file; with --baseline the run is compared to
+an earlier one and the exit status is 1 when a case got slower or allocates more than --threshold.
+
+Usage:
+    python benchmarks/suite.py --scales 1 10 100 --label nightly
+    python benchmarks/suite.py --scales 1 10 --baseline nightly --cases DataCleaner
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from analysis.data_acquisition import DataAcquisition
+from analysis.data_clean import DataCleaner
+from analysis.data_transform import DataTransformer
+from analysis.exploratory import ExploratoryDataAnalysisNICS
+from analysis.nics_store import prepare_nics_rows
+from bench_incident_store import make_frame as make_incident_frame
+
+NICS_PATH = os.path.join(ROOT, 'nics-firearm-background-checks.csv')
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.json')
+
+
+def _quiet(function, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+def _load(loader, *args, **kwargs):
+    # The DataAcquisition loaders print errors and return None; a failed load must not be timed.
+    data = _quiet(loader, *args, **kwargs)
+    if data is None:
+        raise RuntimeError(f"{loader.__name__} failed; run it without the suite to see the error.")
+    return data
+
+
+def _gva_path(csv_path):
+    return csv_path.replace('nics_', 'gva_')
+
+
+def _object_state(data):
+    # standardize_categorical only lowercases object columns; the typed NICS state is categorical.
+    return DataCleaner(data.assign(state=data['state'].astype(object)))
+
+
+def _eda(data):
+    return ExploratoryDataAnalysisNICS(prepare_nics_rows(data.copy()))
+
+
+def _eda_with_cube(data):
+    eda = _eda(data)
+    eda.aggregate_cube()
+    return eda
+
+
+# name -> (prepare(data, csv_path), run(prepared)). prepare is not timed and runs before every run,
+# so methods that modify their frame always start from the same input.
+CASES = {
+    'DataAcquisition.load_nics_bgchecks_data': (
+        lambda data, path: DataAcquisition(None, path),
+        lambda acquisition: _load(acquisition.load_nics_bgchecks_data)),
+    'DataAcquisition.load_nics_bgchecks_data[untyped]': (
+        lambda data, path: DataAcquisition(None, path),
+        lambda acquisition: _load(acquisition.load_nics_bgchecks_data, typed=False)),
+    'DataAcquisition.load_gun_violence_data': (
+        lambda data, path: DataAcquisition(_gva_path(path), None),
+        lambda acquisition: _load(acquisition.load_gun_violence_data)),
+    'DataCleaner.handle_missing_values': (
+        lambda data, path: DataCleaner(data.copy()),
+        lambda cleaner: cleaner.handle_missing_values('median')),
+    'DataCleaner.remove_duplicates': (
+        lambda data, path: DataCleaner(data.copy()),
+        lambda cleaner: cleaner.remove_duplicates(hash_keys=True)),
+    'DataCleaner.numeric_statistics': (
+        lambda data, path: DataCleaner(data),
+        lambda cleaner: cleaner.numeric_statistics()),
+    'DataCleaner.outlier_mask': (
+        lambda data, path: DataCleaner(data),
+        lambda cleaner: cleaner.outlier_mask()),
+    'DataCleaner.check_for_outliers': (
+        lambda data, path: DataCleaner(data),
+        lambda cleaner: cleaner.check_for_outliers('totals')),
+    'DataCleaner.convert_data_types': (
+        lambda data, path: DataCleaner(data.copy()),
+        lambda cleaner: cleaner.convert_data_types('handgun', 'float64')),
+    'DataCleaner.standardize_categorical': (
+        lambda data, path: _object_state(data),
+        lambda cleaner: cleaner.standardize_categorical('state')),
+    'DataCleaner.encode_categorical[onehot]': (
+        lambda data, path: _object_state(data),
+        lambda cleaner: cleaner.encode_categorical('state')),
+    'DataCleaner.encode_categorical[label]': (
+        lambda data, path: _object_state(data),
+        lambda cleaner: cleaner.encode_categorical('state', method='label')),
+    'DataTransformer.extract_date_components': (
+        lambda data, path: DataTransformer(data.copy()),
+        lambda transformer: transformer.extract_date_components('month', drop_original=False)),
+    'ExploratoryDataAnalysisNICS.aggregate_cube': (
+        lambda data, path: _eda(data),
+        lambda eda: eda.aggregate_cube()),
+    'ExploratoryDataAnalysisNICS.year_state_totals': (
+        lambda data, path: _eda_with_cube(data),
+        lambda eda: eda.year_state_totals('totals')),
+    'ExploratoryDataAnalysisNICS.statistics_report': (
+        lambda data, path: _eda(data),
+        lambda eda: eda.statistics_report(by_state=True)),
+}
+
+
+def scale_frame(data, factor):
+    """
+    Repeats the rows of a NICS frame `factor` times; copy i renames every state to '<state> #i'.
+    """
+    if factor == 1:
+        return data
+    positions = np.tile(np.arange(len(data)), factor)
+    copies = np.repeat(np.arange(factor), len(data))
+    states = data['state'].astype('category')
+    categories = states.cat.categories
+    scaled = data.iloc[positions].reset_index(drop=True)
+    scaled['state'] = pd.Categorical.from_codes(
+        states.cat.codes.to_numpy()[positions] + copies * len(categories),
+        [f'{state} #{copy}' for copy in range(factor) for state in categories])
+    return scaled
+
+
+def prepare_inputs(factor, work_dir):
+    """
+    Writes the NICS file scaled by `factor` and an incident file of the same length to work_dir
+    (each once, so a work dir that has only one of them gets the other) and returns the path of
+    the NICS file.
+    """
+    path = os.path.join(work_dir, f'nics_x{factor}.csv')
+    if not os.path.exists(path):
+        scale_frame(pd.read_csv(NICS_PATH), factor).to_csv(path, index=False)
+    if not os.path.exists(_gva_path(path)):
+        rows = len(pd.read_csv(NICS_PATH, usecols=['state'])) * factor
+        make_incident_frame(rows).to_csv(_gva_path(path), index=False)
+    return path
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+def measure(case, csv_path, cache_dir, repeat):
+    """
+    Runs one case in the current process. Meant to be called in a fresh worker process.
+    """
+    prepare, run = CASES[case]
+    data = _load(DataAcquisition(None, csv_path, cache_dir=cache_dir).load_nics_bgchecks_data)
+    rss_before = _peak_rss_mb()
+    times = []
+    for _ in range(repeat):
+        prepared = prepare(data, csv_path)
+        start = time.perf_counter()
+        run(prepared)
+        times.append(time.perf_counter() - start)
+    rss_after = _peak_rss_mb()
+
+    prepared = prepare(data, csv_path)
+    tracemalloc.start()
+    run(prepared)
+    _, allocated = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'case': case, 'rows': len(data), 'seconds': min(times), 'mean_seconds': sum(times) / len(times),
+            'peak_rss_mb': rss_after, 'rss_growth_mb': None if rss_before is None else rss_after - rss_before,
+            'allocated_mb': allocated / (1 << 20)}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scales, cases, repeat, work_dir):
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    context = get_context('spawn')
+    for factor in scales:
+        csv_path = prepare_inputs(factor, work_dir)
+        for case in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(measure, case, csv_path, os.path.join(work_dir, 'cache'), repeat).result()
+            result['scale'] = factor
+            results.append(result)
+            print(f"{case:<50} x{factor:<5} {result['seconds'] * 1000:>10.1f} ms "
+                  f"{result['allocated_mb']:>9.1f} MB alloc  {result['peak_rss_mb'] or 0:>9.1f} MB peak RSS")
+    return results
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def find_run(history, baseline):
+    """
+    Returns the latest run labelled `baseline`, or the latest run for baseline='last'.
+    """
+    runs = history if baseline == 'last' else [run for run in history if run.get('label') == baseline]
+    if not runs:
+        raise SystemExit(f"No run labelled {baseline!r} in the benchmark history.")
+    return runs[-1]
+
+
+def compare(results, baseline_run, threshold):
+    """
+    Prints the ratios of wall time and allocations to the baseline run.
+    :return: List of (case, scale, metric, ratio) that exceed 1 + threshold.
+    """
+    before = {(result['case'], result['scale']): result for result in baseline_run['results']}
+    regressions = []
+    print(f"\nCompared with {baseline_run.get('label') or baseline_run['timestamp']} ({baseline_run.get('commit')}):")
+    for result in results:
+        old = before.get((result['case'], result['scale']))
+        if old is None:
+            continue
+        ratios = {metric: result[metric] / old[metric] if old[metric] else 1.0 for metric in ('seconds', 'allocated_mb')}
+        flags = [metric for metric, ratio in ratios.items() if ratio > 1 + threshold]
+        regressions += [(result['case'], result['scale'], metric, ratios[metric]) for metric in flags]
+        print(f"{result['case']:<50} x{result['scale']:<5} time {ratios['seconds']:>5.2f}x  "
+              f"alloc {ratios['allocated_mb']:>5.2f}x{'  REGRESSION' if flags else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help='row multipliers of the NICS file, e.g. 1 10 100 1000')
+    parser.add_argument('--cases', nargs='+', default=None,
+                        help='run only cases whose name starts with one of these prefixes')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--label', default=None, help='name stored with the run, usable as a baseline')
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--baseline', default=None, help="label of the run to compare with, or 'last'")
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown reported as a regression')
+    parser.add_argument('--work-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '.suite'))
+    args = parser.parse_args()
+
+    cases = [case for case in CASES if args.cases is None or any(case.startswith(prefix) for prefix in args.cases)]
+    history = load_history(args.history)
+    baseline_run = find_run(history, args.baseline) if args.baseline else None
+    results = run_suite(args.scales, cases, args.repeat, args.work_dir)
+
+    history.append({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'label': args.label, 'commit': _git_commit(),
+                    'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                    'results': results})
+    with open(args.history, 'w', encoding='utf-8') as handle:
+        json.dump(history, handle, indent=1)
+    if baseline_run is not None and compare(results, baseline_run, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,22 +12,23 @@ setup(
     packages=find_packages(),
     install_requires=[
         "requests>=2.25.1",
-        "pandas>=1.2.0",
+        "pandas>=1.5.0",  # DataFrame.corr(numeric_only=...)
         "beautifulsoup4>=4.9.3",
-        "numpy>=1.20.0",
+        "numpy>=1.20.3",  # oldest NumPy supported by pandas 1.5
         "matplotlib>=3.3.4",
         "seaborn>=0.11.1",
         "scipy>=1.6.0",
     ],
-    python_requires=">=3.6",  # Minimum Python version required
+    extras_require={
+        "parquet": ["pyarrow>=1.0.0"],
+    },
+    python_requires=">=3.8",  # Minimum Python version required
 
     # Additional metadata for PyPI
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
     ],
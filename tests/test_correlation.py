@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.correlation import MonthlyStatePanel
+from analysis.data_acquisition import DataAcquisition
+
+NICS_PATH = os.path.join(os.path.dirname(__file__), '..', 'nics-firearm-background-checks.csv')
+COLUMNS = ['permit', 'handgun', 'long_gun', 'returned_handgun', 'totals']
+
+
+@pytest.fixture(scope='module')
+def data():
+    nics = DataAcquisition(None, NICS_PATH).load_nics_bgchecks_data()
+    rng = np.random.default_rng(0)
+    # Drop a third of the months of a few states so the panel has holes.
+    holes = nics['state'].isin(['Alaska', 'Ohio', 'Guam']) & (rng.random(len(nics)) < 0.3)
+    nics = nics[~holes]
+    states = nics['state'].astype(str).unique()
+    count = 20000
+    dates = pd.Timestamp('2014-01-01') + pd.to_timedelta(rng.integers(0, 3000, count), unit='D')
+    incidents = pd.DataFrame({'date': dates, 'state': rng.choice(np.append(states, 'Atlantis'), count),
+                              'n_killed': rng.integers(0, 4, count), 'n_injured': rng.integers(0, 6, count)})
+    return nics, incidents
+
+
+def merged_frame(nics, incidents):
+    month = incidents['date'].dt.to_period('M').dt.to_timestamp()
+    counts = incidents.assign(month=month, incidents=1).groupby(['month', 'state'])[['incidents', 'n_killed', 'n_injured']].sum()
+    start, end = month.min(), month.max()
+    rows = nics[(nics['month'] >= start) & (nics['month'] <= end)].assign(state=lambda frame: frame['state'].astype(str))
+    merged = rows.merge(counts.reset_index(), on=['month', 'state'], how='left')
+    merged[['incidents', 'n_killed', 'n_injured']] = merged[['incidents', 'n_killed', 'n_injured']].fillna(0)
+    merged[COLUMNS] = merged[COLUMNS].astype('float64')
+    return merged
+
+
+def test_correlations_match_merge_and_corrwith(data):
+    nics, incidents = data
+    panel = MonthlyStatePanel.build(nics, incidents, columns=COLUMNS)
+    merged = merged_frame(nics, incidents)
+    assert len(panel.panel) == len(merged)
+
+    result = panel.correlations()
+    for measure in ['incidents', 'n_killed', 'n_injured']:
+        expected = merged[COLUMNS].corrwith(merged[measure])
+        np.testing.assert_allclose(result[measure].to_numpy(), expected.to_numpy())
+
+    demeaned = merged[COLUMNS + ['incidents']] - merged.groupby('state')[COLUMNS + ['incidents']].transform('mean')
+    expected = demeaned[COLUMNS].corrwith(demeaned['incidents'])
+    np.testing.assert_allclose(panel.correlations(within_state=True)['incidents'].to_numpy(), expected.to_numpy())
+
+
+def test_lagged_correlations_pair_later_months_of_the_same_state(data):
+    nics, incidents = data
+    panel = MonthlyStatePanel.build(nics, incidents, columns=COLUMNS)
+    merged = merged_frame(nics, incidents).set_index(['month', 'state'])
+    months = pd.date_range(merged.index.get_level_values('month').min(), merged.index.get_level_values('month').max(), freq='MS')
+    grid = merged.reindex(pd.MultiIndex.from_product([months, sorted(merged.index.unique('state'))], names=['month', 'state']))
+    lagged = panel.cross_correlations(max_lag=2)['incidents']
+    for lag in (-2, 1):
+        later = grid['incidents'].groupby(level='state').shift(-lag)
+        expected = grid[COLUMNS].corrwith(later)
+        np.testing.assert_allclose(lagged.loc[lag].to_numpy(), expected.to_numpy())
+
+
+def test_save_and_open_round_trip(data, tmp_path):
+    nics, incidents = data
+    panel = MonthlyStatePanel.build(nics, incidents, columns=COLUMNS)
+    panel.save(str(tmp_path / 'panel'))
+    opened = MonthlyStatePanel.open(str(tmp_path / 'panel'))
+    pd.testing.assert_frame_equal(opened.panel, panel.panel, check_freq=False)
+    assert opened.nics_columns == COLUMNS and opened.incident_columns == panel.incident_columns
+    pd.testing.assert_frame_equal(opened.cross_correlations(3), panel.cross_correlations(3))
@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+import pytest
+
+from analysis import data_acquisition
+from analysis.data_acquisition import DataAcquisition
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'incidents.csv'
+    pd.DataFrame({'state': ['Ohio', 'Texas'], 'n_killed': [1, 2]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_cache_round_trip(csv_path, tmp_path):
+    acquisition = DataAcquisition(csv_path, None, cache_dir=str(tmp_path / 'cache'))
+    first = acquisition.read_csv_cached(csv_path)
+    second = acquisition.read_csv_cached(csv_path)
+    pd.testing.assert_frame_equal(first, second)
+    assert sorted(os.path.splitext(name)[1] for name in os.listdir(tmp_path / 'cache')) == \
+        sorted(['.json', f'.{data_acquisition.CACHE_FORMAT}'])
+
+
+def test_failed_cache_write_leaves_no_valid_meta(csv_path, tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    acquisition = DataAcquisition(csv_path, None, cache_dir=str(cache_dir))
+    acquisition.read_csv_cached(csv_path)
+    pd.DataFrame({'state': ['Utah'], 'n_killed': [3]}).to_csv(csv_path, index=False)
+
+    def interrupted_write(self, path, *args, **kwargs):
+        with open(path, 'wb') as handle:
+            handle.write(b'partial')
+        raise OSError('disk full')
+
+    writer = 'to_parquet' if data_acquisition.CACHE_FORMAT == 'parquet' else 'to_pickle'
+    with monkeypatch.context() as patch:
+        patch.setattr(pd.DataFrame, writer, interrupted_write)
+        with pytest.raises(OSError):
+            acquisition.read_csv_cached(csv_path)
+
+    names = os.listdir(cache_dir)
+    assert not any(name.endswith(('.json', '.tmp')) for name in names)
+    assert acquisition.read_csv_cached(csv_path)['state'].tolist() == ['Utah']
+
+
+def test_nics_schema_is_at_least_three_times_smaller(capsys):
+    nics_path = os.path.join(os.path.dirname(__file__), '..', 'nics-firearm-background-checks.csv')
+    report = DataAcquisition(None, nics_path).nics_memory_report()
+    assert report.loc['total', 'ratio'] >= 3
+
+
+def test_counts_that_outgrow_their_width_are_widened(tmp_path):
+    path = str(tmp_path / 'nics.csv')
+    pd.DataFrame({'month': ['2020-01', '2020-02'], 'state': ['Ohio', 'Ohio'],
+                  'multiple': [70000, None], 'totals': [1, 2]}).to_csv(path, index=False)
+    data = DataAcquisition(None, path).load_nics_bgchecks_data()
+    assert data['multiple'].tolist() == [70000, pd.NA]
+    assert data['multiple'].dtype == data_acquisition.count_dtype(32)
+    assert data['totals'].dtype == data_acquisition.NICS_DTYPES['totals']
@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+
+from analysis.data_clean import DataCleaner
+
+
+@pytest.mark.parametrize('subset', [None, ['state']])
+def test_remove_duplicates_methods_agree(subset):
+    frames = [pd.DataFrame({'state': ['Ohio', 'Ohio', 'Utah', 'Ohio', 'Utah'], 'totals': [1, 1, 2, 3, 2]},
+                           index=[10, 10, 11, 12, 13]) for _ in range(2)]
+    results = [DataCleaner(frame).remove_duplicates(subset=subset, hash_keys=hash_keys)
+               for frame, hash_keys in zip(frames, (False, True))]
+
+    pd.testing.assert_frame_equal(results[1], results[0])
+    # Both methods trim the frame they were given, as the other cleaning steps do.
+    for frame, result in zip(frames, results):
+        assert result is frame
+    pd.testing.assert_frame_equal(frames[1], frames[0])
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.data_transform import DataTransformer
+
+
+def reference(column, date_format=None):
+    dates = pd.to_datetime(column, format=date_format)
+    return {'year': dates.dt.year, 'month': dates.dt.month, 'day': dates.dt.day}
+
+
+@pytest.mark.parametrize('cache', [True, False])
+def test_repeated_dates_match_the_datetime_accessor(cache):
+    months = pd.Series(np.random.default_rng(0).choice(['1998-11', '2005-02', '2019-12', '2023-07'], 1000))
+    frame = pd.DataFrame({'month': months, 'totals': np.arange(1000)})
+    result = DataTransformer(frame).extract_date_components('month', date_format='%Y-%m', cache=cache)
+
+    assert list(result.columns) == ['totals', 'month_year', 'month_month', 'month_day']
+    assert result['month_year'].dtype == np.int16
+    assert result['month_month'].dtype == np.int8 and result['month_day'].dtype == np.int8
+    for component, expected in reference(months, '%Y-%m').items():
+        np.testing.assert_array_equal(result[f'month_{component}'].to_numpy(), expected.to_numpy())
+
+
+@pytest.mark.parametrize('cache', [True, False])
+def test_missing_dates_become_nullable_na(cache):
+    dates = pd.Series(['March 1, 2019', None, 'March 1, 2019', 'July 4, 2020', None])
+    frame = pd.DataFrame({'date': dates})
+    result = DataTransformer(frame).extract_date_components('date', drop_original=False, date_format='%B %d, %Y', cache=cache)
+
+    assert result['date_year'].dtype == 'Int16'
+    assert result['date_month'].dtype == 'Int8' and result['date_day'].dtype == 'Int8'
+    for component, expected in reference(dates, '%B %d, %Y').items():
+        pd.testing.assert_series_equal(result[f'date_{component}'], expected.astype(result[f'date_{component}'].dtype),
+                                       check_names=False)
+    assert result['date'].isna().tolist() == [False, True, False, False, True]
+    pd.testing.assert_series_equal(result['date'], pd.to_datetime(dates, format='%B %d, %Y'), check_names=False,
+                                   check_dtype=False)
+
+
+@pytest.mark.parametrize('cache', [True, False])
+def test_all_dates_missing(cache):
+    frame = pd.DataFrame({'date': pd.Series([None, None], dtype=object)})
+    result = DataTransformer(frame).extract_date_components('date', cache=cache)
+    assert result['date_year'].isna().all() and result['date_year'].dtype == 'Int16'
+
+
+@pytest.mark.parametrize('cache', [True, False])
+def test_drop_original(cache):
+    frame = pd.DataFrame({'month': ['2020-01', '2020-02'], 'state': ['Ohio', 'Texas']})
+    result = DataTransformer(frame.copy()).extract_date_components('month', drop_original=True, cache=cache)
+    assert 'month' not in result.columns
+
+    kept = DataTransformer(frame.copy()).extract_date_components('month', drop_original=False, cache=cache)
+    assert kept['month'].dtype.kind == 'M'
+    assert kept['month'].tolist() == [pd.Timestamp('2020-01-01'), pd.Timestamp('2020-02-01')]
+
+
+def test_factorize_path_parses_each_distinct_date_once(monkeypatch):
+    calls = []
+    to_datetime = pd.to_datetime
+
+    def counting(values, *args, **kwargs):
+        calls.append(len(values))
+        return to_datetime(values, *args, **kwargs)
+
+    monkeypatch.setattr(pd, 'to_datetime', counting)
+    months = pd.Series(['2020-01', '2020-02', '2020-01', None] * 250)
+    result = DataTransformer(pd.DataFrame({'month': months})).extract_date_components('month', date_format='%Y-%m', cache=True)
+    assert calls == [2]
+    assert result['month_month'].value_counts().to_dict() == {1: 500, 2: 250}
+
+    calls.clear()
+    DataTransformer(pd.DataFrame({'month': months})).extract_date_components('month', date_format='%Y-%m', cache=False)
+    assert calls == [1000]
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.exploratory import ExploratoryDataAnalysis, ExploratoryDataAnalysisNICS, binned_kde
+
+
+def nics_frame():
+    return pd.DataFrame({
+        'date_year': [2020, 2020, 2021, 2021],
+        'date_month': [1, 2, 1, 1],
+        'state': pd.Categorical(['Ohio', 'Ohio', 'Texas', 'Ohio']),
+        'handgun': pd.array([1, 2, 3, None], dtype='UInt16'),
+        'totals': [10.0, 20.0, 30.0, 40.0],
+    })
+
+
+def test_aggregate_cube_is_cached_until_the_frame_changes():
+    eda = ExploratoryDataAnalysisNICS(nics_frame())
+    cube = eda.aggregate_cube()
+    assert eda.aggregate_cube() is cube
+
+
+def test_aggregate_cube_sees_in_place_edits():
+    df = nics_frame()
+    eda = ExploratoryDataAnalysisNICS(df)
+    assert eda.aggregate_cube().loc[(2021, 1, 'Ohio'), 'handgun'] == 0
+
+    df.fillna({'handgun': 5}, inplace=True)
+    assert eda.aggregate_cube().loc[(2021, 1, 'Ohio'), 'handgun'] == 5
+
+    df.loc[0, 'totals'] = 11.0
+    assert eda.aggregate_cube().loc[(2020, 1, 'Ohio'), 'totals'] == 11.0
+
+    df.loc[3, 'state'] = 'Texas'
+    assert eda.aggregate_cube().loc[(2021, 1, 'Texas'), 'totals'] == 70.0
+
+    expected = df.groupby(['date_year', 'date_month', 'state'], observed=True)[['handgun', 'totals']].sum()
+    np.testing.assert_array_equal(eda.aggregate_cube().to_numpy(), expected.to_numpy(dtype='float64'))
+
+
+def test_binned_kde_degenerate_inputs():
+    grid, density = binned_kde([np.nan, np.inf])
+    assert len(grid) == len(density) == 0
+
+    for values in ([3.0], [2.0, 2.0, 2.0]):
+        grid, density = binned_kde(values, bins=256)
+        assert np.isfinite(density).all()
+        assert grid[np.argmax(density)] == pytest.approx(values[0], abs=grid[1] - grid[0])
+        assert (density * (grid[1] - grid[0])).sum() == pytest.approx(1, abs=0.01)
+
+
+def test_binned_kde_matches_exact_kde():
+    values = np.random.default_rng(0).normal(size=5000)
+    grid, density = binned_kde(values, bins=1024, bandwidth=0.3)
+    exact = np.exp(-0.5 * ((grid[:, None] - values) / 0.3) ** 2).sum(axis=1) / (len(values) * 0.3 * np.sqrt(2 * np.pi))
+    np.testing.assert_allclose(density, exact, atol=5e-3)
+
+
+def test_pairplot_is_only_shown_on_request(monkeypatch):
+    plt = pytest.importorskip('matplotlib.pyplot')
+    shown = []
+    monkeypatch.setattr(plt, 'show', lambda: shown.append(True))
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'a': rng.normal(size=300), 'b': rng.normal(size=300), 'group': rng.choice(['x', 'y'], 300)})
+    eda = ExploratoryDataAnalysis(frame, sample_threshold=100, sample_size=50)
+
+    grid = eda.pairplot_relationships(['a', 'b'], hue='group', show=False)
+    assert not shown
+    assert grid.fig._suptitle.get_text().startswith('Pair Plot [sample stratified by group')
+    plt.close(grid.fig)
+
+    grid = eda.pairplot_relationships(['a', 'b'])
+    assert shown == [True]
+    plt.close(grid.fig)
@@ -0,0 +1,225 @@
+import datetime
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+import requests
+
+from analysis.gvascrape import PARSER_BACKENDS, GunViolenceDataCollector, HostRateLimiter, ResponseCache, lxml_html
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fixtures')
+FIXTURE = os.path.join(FIXTURES, 'gva_incidents_2019_page_0.html')
+LAST_PAGE = 5
+
+
+class StubGVA:
+    """
+    Serves the 2019 fixture page on localhost as LAST_PAGE + 1 result pages with distinct incident IDs.
+    `failures` maps a page number to the number of 503 responses to send before serving it.
+    Every page carries `etag`; a request whose If-None-Match matches it gets a 304.
+    """
+    def __init__(self):
+        with open(FIXTURE, encoding='utf-8') as handle:
+            self.template = handle.read().replace('page=2400&amp;year=2019', f'page={LAST_PAGE}&amp;year=2019')
+        self.failures = {}
+        self.requests = []
+        self.conditional = []
+        self.etag = '"v1"'
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                page = int(query['page'][0]) if 'page' in query else None
+                with stub.lock:
+                    stub.requests.append(page)
+                    failing = stub.failures.get(page, 0)
+                    if failing:
+                        stub.failures[page] = failing - 1
+                    stub.conditional.append(self.headers.get('If-None-Match'))
+                if failing:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if self.headers.get('If-None-Match') == stub.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = stub.template.replace('<td>3519', f'<td>{page or 0:02d}9').encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', stub.etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def page_requests(self, page):
+        return self.requests.count(page)
+
+
+@pytest.fixture
+def stub():
+    server = StubGVA()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_retries_503_with_backoff(stub):
+    stub.failures = {2: 2}
+    collector = GunViolenceDataCollector(stub.base_url, backoff_factor=0.01)
+    delays = []
+    retry_delay = collector._retry_delay
+
+    def recorded_delay(attempt, response=None):
+        delays.append(retry_delay(attempt, response))
+        return delays[-1]
+
+    collector._retry_delay = recorded_delay
+
+    df = collector.scrape_data(2019)
+
+    assert len(df) == 25 * (LAST_PAGE + 1)
+    assert stub.page_requests(2) == 3
+    assert len(delays) == 2 and delays[1] > delays[0] > 0
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.failures = {1: 10}
+    collector = GunViolenceDataCollector(stub.base_url, max_retries=2, backoff_factor=0)
+    with pytest.raises(requests.HTTPError):
+        collector.scrape_data(2019)
+    assert stub.page_requests(1) == 3
+
+
+def test_checkpoint_resumes_and_is_cleared(stub, tmp_path):
+    checkpoint_path = str(tmp_path / 'crawl.jsonl')
+    stub.failures = {3: 10}
+    interrupted = GunViolenceDataCollector(stub.base_url, max_retries=0, checkpoint_path=checkpoint_path)
+    with pytest.raises(requests.HTTPError):
+        interrupted.scrape_data(2019)
+    assert len(interrupted.checkpoint) == 3
+    assert os.path.exists(checkpoint_path)
+
+    stub.failures = {}
+    resumed = GunViolenceDataCollector(stub.base_url, checkpoint_path=checkpoint_path)
+    df = resumed.collect_data_for_years(2019, 2019)
+
+    assert [stub.page_requests(page) for page in range(LAST_PAGE + 1)] == [1, 1, 1, 2, 1, 1]
+    assert df['Incident ID'].is_unique and len(df) == 25 * (LAST_PAGE + 1)
+    assert not os.path.exists(checkpoint_path) and len(resumed.checkpoint) == 0
+
+
+def test_concurrent_crawl_matches_sequential(stub):
+    sequential = GunViolenceDataCollector(stub.base_url).collect_data_for_years(2019, 2019)
+    concurrent = GunViolenceDataCollector(stub.base_url, max_workers=4).collect_data_for_years(2019, 2019)
+    pd.testing.assert_frame_equal(sequential, concurrent)
+    assert sequential['Incident ID'].tolist()[:2] == ['009000', '009001']
+
+
+def test_fetch_content_hit_miss_and_revalidation(stub, tmp_path):
+    url = f'{stub.base_url}/reports/total-number-of-incidents?page=1&year=2019'
+    cache = ResponseCache(str(tmp_path), ttl_by_year={2019: 3600})
+    collector = GunViolenceDataCollector(stub.base_url, response_cache=cache)
+
+    body = collector.fetch_content(url)
+    assert cache.stats() == {'hits': 0, 'revalidations': 0, 'misses': 1}
+    assert collector.fetch_content(url) == body
+    assert cache.stats() == {'hits': 1, 'revalidations': 0, 'misses': 1}
+    assert stub.page_requests(1) == 1
+
+    # Once the entry is stale it is revalidated with its ETag and the cached body is reused.
+    cache.ttl_by_year[2019] = 0
+    assert collector.fetch_content(url) == body
+    assert cache.stats() == {'hits': 1, 'revalidations': 1, 'misses': 1}
+    assert stub.page_requests(1) == 2 and stub.conditional[-1] == '"v1"'
+
+    # A changed page fails the revalidation and is downloaded again.
+    stub.etag = '"v2"'
+    stub.template = stub.template.replace('<td>3519', '<td>4519')
+    assert collector.fetch_content(url) != body
+    assert cache.stats() == {'hits': 1, 'revalidations': 1, 'misses': 2}
+    assert cache.lookup(url)[0]['etag'] == '"v2"'
+
+
+def test_last_page_number_is_only_remembered_for_past_years(stub):
+    collector = GunViolenceDataCollector(stub.base_url)
+    for _ in range(2):
+        assert len(collector.collect_pagination_urls(2019)) == LAST_PAGE + 1
+    assert stub.page_requests(None) == 1
+
+    year = datetime.date.today().year
+    for _ in range(2):
+        collector.collect_pagination_urls(year)
+    assert stub.page_requests(None) == 3
+
+
+def test_last_page_number_follows_the_cache_ttl(stub, tmp_path):
+    year = datetime.date.today().year
+    cache = ResponseCache(str(tmp_path), current_year_ttl=3600)
+    collector = GunViolenceDataCollector(stub.base_url, response_cache=cache)
+    collector.collect_pagination_urls(year)
+    collector.collect_pagination_urls(year)
+    assert stub.page_requests(None) == 1
+
+    cache.current_year_ttl = 0
+    collector.collect_pagination_urls(year)
+    assert stub.page_requests(None) == 2 and cache.revalidations == 1
+
+
+def test_host_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(requests_per_second=20)
+    times = {'a': [], 'b': []}
+
+    def request(host):
+        limiter.wait(f'http://{host}.example/page')
+        times[host].append(time.monotonic())
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=request, args=(host,)) for host in 'aaaab']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    spacing = [later - earlier for earlier, later in zip(sorted(times['a']), sorted(times['a'])[1:])]
+    assert min(spacing) >= 0.04
+    assert max(times['a']) - start >= 0.14
+    # Another host has its own schedule and is not held up by the first one.
+    assert times['b'][0] - start < 0.04
+
+
+def test_host_rate_limiter_without_a_limit_does_not_wait():
+    limiter = HostRateLimiter()
+    start = time.monotonic()
+    for _ in range(100):
+        limiter.wait('http://a.example/page')
+    assert time.monotonic() - start < 0.05
+
+
+@pytest.mark.skipif(lxml_html is None, reason='lxml is not installed')
+@pytest.mark.parametrize('name', sorted(os.listdir(FIXTURES)))
+def test_parser_backends_agree_on_fixtures(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as handle:
+        content = handle.read()
+    headers, rows = PARSER_BACKENDS['bs4'](content)
+    assert PARSER_BACKENDS['lxml'](content) == (headers, rows)
+    assert len(rows) == 25 and headers[-2:] == ['View Incident Link', 'View Source Link']
+
+
+@pytest.mark.skipif(lxml_html is None, reason='lxml is not installed')
+def test_parser_backends_agree_on_stub_pages(stub):
+    frames = [GunViolenceDataCollector(stub.base_url, parser_backend=backend).scrape_data(2019) for backend in ('bs4', 'lxml')]
+    pd.testing.assert_frame_equal(*frames)
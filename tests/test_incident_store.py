@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.data_acquisition import CACHE_FORMAT
+from analysis.incident_store import IncidentStore
+
+BASE_URL = 'https://www.gunviolencearchive.org/incident/'
+
+
+def scraped(ids, links=None):
+    return pd.DataFrame({
+        'Incident ID': [str(incident_id) for incident_id in ids],
+        'Incident Date': ['January 2, 2021'] * len(ids),
+        'State': ['Ohio'] * len(ids),
+        'City Or County': ['Akron'] * len(ids),
+        '# Killed': ['0'] * len(ids),
+        '# Injured': ['1'] * len(ids),
+        'View Incident Link': links if links is not None else [f'{BASE_URL}{incident_id}' for incident_id in ids],
+    })
+
+
+def test_links_without_an_id_fall_back_to_the_incident_id_column():
+    store = IncidentStore()
+    store.insert(scraped([7, 8, 9], [f'{BASE_URL}view', f'{BASE_URL}8', None]))
+    assert store.link_prefix == BASE_URL
+    assert sorted(store.df['incident_id']) == [7, 8, 9]
+    assert store.incident_url([8]).tolist() == [f'{BASE_URL}8']
+
+
+def test_get_on_an_empty_store():
+    store = IncidentStore()
+    store.insert(scraped([]))
+    assert len(store) == 0
+    assert store.get([1, 2]).empty
+    store.insert(scraped([1, 2]))
+    assert store.get([2, 3])['incident_id'].tolist() == [2]
+
+
+def random_incidents(count, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(np.arange(100000, 100000 + count))
+    dates = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 1000, count), unit='D')
+    return pd.DataFrame({
+        'Incident ID': ids.astype(str),
+        'Incident Date': dates.strftime('%B %d, %Y'),
+        'State': rng.choice(['Ohio', 'Texas', 'Maine', 'Utah'], count),
+        'City Or County': rng.choice(['Akron', 'Austin', 'Portland', 'Springfield', 'Columbus'], count),
+        '# Killed': rng.integers(0, 3, count).astype(str),
+        '# Injured': rng.integers(0, 5, count).astype(str),
+        'View Incident Link': [f'{BASE_URL}{incident_id}' for incident_id in ids],
+    })
+
+
+@pytest.fixture(scope='module')
+def store():
+    store = IncidentStore()
+    store.insert(random_incidents(5000))
+    return store
+
+
+@pytest.mark.parametrize('start, end, state, city', [
+    (None, None, None, None),
+    ('2019-03-01', '2020-02-29', None, None),
+    ('2020-01-01', None, 'Texas', None),
+    (None, '2019-12-31', None, 'Springfield'),
+    ('2019-06-01', '2021-06-01', 'Maine', 'Portland'),
+    ('2019-06-01', '2021-06-01', 'Nowhere', None),
+])
+def test_query_matches_boolean_masks(store, start, end, state, city):
+    df = store.df
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df['date'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df['date'] <= pd.Timestamp(end)
+    if state is not None:
+        mask &= df['state'] == state
+    if city is not None:
+        mask &= df['city_or_county'] == city
+    expected = df[mask].sort_values(['date', 'incident_id'])
+    result = store.query(start, end, state=state, city=city).sort_values(['date', 'incident_id'])
+    pd.testing.assert_frame_equal(result, expected)
+    assert result['date'].is_monotonic_increasing
+
+
+def test_get_matches_isin(store):
+    ids = [100003, 104999, 100003, 1, 102500]
+    expected = store.df[store.df['incident_id'].isin(ids)].sort_values('incident_id')
+    pd.testing.assert_frame_equal(store.get(ids).drop_duplicates().sort_values('incident_id'), expected)
+    assert store.get(100003)['incident_id'].tolist() == [100003]
+
+
+@pytest.mark.parametrize('keep, killed', [('last', 9), ('first', 0)])
+def test_insert_deduplicates_on_incident_id(keep, killed):
+    store = IncidentStore()
+    assert store.insert(scraped([1, 2, 3])) == 3
+    rescrape = scraped([3, 4, 4])
+    rescrape['# Killed'] = '9'
+    assert store.insert(rescrape, keep=keep) == 1
+    assert sorted(store.df['incident_id']) == [1, 2, 3, 4]
+    assert store.get(3)['n_killed'].tolist() == [killed]
+    assert store.get(4)['n_killed'].tolist() == [9]
+
+
+def test_interrupted_save_keeps_the_previous_store(store, tmp_path, monkeypatch):
+    path = str(tmp_path / 'incidents')
+    store.save(path)
+    store.save(path)
+    # No temporary files are left behind.
+    assert sorted(os.listdir(path)) == sorted(['meta.json', f'incidents.{CACHE_FORMAT}'])
+
+    smaller = IncidentStore()
+    smaller.insert(scraped([1, 2]))
+
+    def crash(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', crash)
+    with pytest.raises(OSError):
+        smaller.save(path)
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(IncidentStore.open(path).df, store.df)
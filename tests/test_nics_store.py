@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pytest
+
+from analysis.nics_store import NICSStore
+
+STATES = ['Ohio', 'Texas', 'Utah']
+
+
+def write_source(path, months):
+    rows = [{'month': month, 'state': state, 'handgun': 10 * i + j, 'totals': 100 * i + j}
+            for i, month in enumerate(months) for j, state in enumerate(STATES)]
+    # The NICS file lists the newest month first.
+    pd.DataFrame(rows[::-1]).to_csv(path, index=False)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'nics.csv')
+    write_source(path, ['2020-01', '2020-02'])
+    return path
+
+
+def assert_same_store(store, expected):
+    pd.testing.assert_frame_equal(store.load(), expected.load())
+    pd.testing.assert_frame_equal(store.monthly_state_totals(), expected.monthly_state_totals())
+    pd.testing.assert_frame_equal(store.yearly_totals(), expected.yearly_totals())
+    pd.testing.assert_frame_equal(store.cumulative_totals(), expected.cumulative_totals())
+
+
+def test_incremental_update_matches_rebuild(source, tmp_path, capsys):
+    store = NICSStore(str(tmp_path / 'store'), source)
+    assert store.update()['mode'] == 'rebuild'
+    write_source(source, ['2020-01', '2020-02', '2020-03', '2021-01'])
+    assert store.update() == {'mode': 'incremental', 'new_months': 2, 'new_rows': 6, 'rows': 12}
+    assert store.update()['mode'] == 'unchanged'
+
+    rebuilt = NICSStore(str(tmp_path / 'rebuilt'), source)
+    rebuilt.rebuild()
+    assert_same_store(store, rebuilt)
+
+
+def test_files_not_in_the_manifest_are_ignored(source, tmp_path, capsys):
+    store = NICSStore(str(tmp_path / 'store'), source)
+    store.update()
+    expected = store.load()
+
+    # An update that crashed after writing its part and aggregates but before the manifest.
+    orphan_rows = expected.iloc[:2]
+    store._write_part(orphan_rows, 1)
+    store._write_frame(store.monthly_state_totals().iloc[:1], store._path('monthly_state_totals', 1))
+    pd.testing.assert_frame_equal(store.load(), expected)
+
+    write_source(source, ['2020-01', '2020-02', '2020-03'])
+    store.update()
+    rebuilt = NICSStore(str(tmp_path / 'rebuilt'), source)
+    rebuilt.rebuild()
+    assert_same_store(store, rebuilt)
+    assert sorted(os.listdir(store.rows_dir)) == [os.path.basename(path) for path in store._part_paths()]
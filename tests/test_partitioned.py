@@ -0,0 +1,67 @@
+import gc
+import warnings
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.data_acquisition import count_dtype
+from analysis.data_clean import DataCleaner
+from analysis.exploratory import describe_columns
+from analysis.partitioned import PartitionedExecutor, run_cleaner
+
+
+def make_frame(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    states = np.array(['Alabama', 'Alaska', 'Arizona', 'Texas', 'Utah'])
+    return pd.DataFrame({
+        'state': states[rng.integers(0, len(states), rows)],
+        'city': pd.Series(rng.choice(['a', 'b', 'c'], rows), dtype=object),
+        'totals': pd.array(rng.negative_binomial(2, 0.01, rows), dtype='UInt32'),
+        'handgun': rng.normal(100, 20, rows),
+        'permit': pd.array(np.where(rng.random(rows) < 0.3, None, rng.integers(0, 500, rows)), dtype=count_dtype(16)),
+    }, index=pd.RangeIndex(10, 10 + rows))
+
+
+def test_object_and_string_columns_with_processes():
+    df = make_frame()
+    expected = pd.concat([DataCleaner(group).check_for_outliers('totals')
+                          for _, group in df.groupby('state')]).sort_index()
+    with PartitionedExecutor(df, 'state', processes=2) as executor:
+        outliers = executor.apply(run_cleaner, 'check_for_outliers', 'totals', rows=True)
+        statistics = executor.apply(describe_columns, ['totals', 'handgun', 'permit'])
+        filled = executor.apply(run_cleaner, 'handle_missing_values', 'median', 'permit', rows=True)
+    pd.testing.assert_frame_equal(outliers, expected, check_dtype=False)
+    assert list(outliers['city']) == list(expected['city'])
+    assert set(statistics.index.get_level_values('state')) == set(df['state'])
+    expected_filled = pd.concat([DataCleaner(group.copy()).handle_missing_values('median', 'permit')
+                                 for _, group in df.groupby('state')]).sort_index()
+    pd.testing.assert_series_equal(filled['permit'], expected_filled['permit'])
+
+
+def test_in_place_methods_do_not_touch_the_frame():
+    df = make_frame()
+    df.loc[df.index[::7], 'handgun'] = np.nan
+    before = df.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        with PartitionedExecutor(df, 'state', processes=1) as executor:
+            filled = executor.apply(run_cleaner, 'handle_missing_values', 'median', rows=True)
+    pd.testing.assert_frame_equal(df, before)
+    assert filled['handgun'].notna().all()
+    assert len(filled) == len(df)
+
+
+@pytest.mark.parametrize('closed', [False, True])
+def test_shared_memory_is_unlinked_without_close(closed):
+    executor = PartitionedExecutor(make_frame(), 'state', processes=2)
+    assert len(executor.apply(describe_columns, ['totals'])) == 5
+    name = executor._memory.name
+    shared_memory.SharedMemory(name=name).close()
+    if closed:
+        executor.close()
+    del executor
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
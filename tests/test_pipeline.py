@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+import pytest
+
+from analysis.data_acquisition import DataAcquisition
+from analysis.data_clean import DataCleaner
+from analysis.pipeline import ChunkedPipeline
+
+NICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'nics-firearm-background-checks.csv')
+
+
+@pytest.fixture
+def acquisition():
+    return DataAcquisition(None, NICS_PATH)
+
+
+def in_memory(acquisition):
+    data = DataCleaner(acquisition.load_nics_bgchecks_data(typed=False)).handle_missing_values('median')
+    lower, upper = DataCleaner(data).outlier_bounds('returned_handgun')
+    data['returned_handgun_outlier'] = (data['returned_handgun'] < lower) | (data['returned_handgun'] > upper)
+    return data
+
+
+def test_untyped_median_fill_to_parquet(acquisition, tmp_path):
+    pytest.importorskip('pyarrow')
+    sink = str(tmp_path / 'nics.parquet')
+    pipeline = ChunkedPipeline(lambda: acquisition.iter_nics_bgchecks_chunks(3000, typed=False), sink)
+    pipeline.add_step('handle_missing_values', strategy='median').run()
+    result = pd.read_parquet(sink)
+    assert len(result) == 13145
+    assert result.select_dtypes('number').notna().all().all()
+
+
+def test_outlier_fences_follow_earlier_fills(acquisition, tmp_path):
+    sink = str(tmp_path / 'nics.csv')
+    pipeline = ChunkedPipeline(lambda: acquisition.iter_nics_bgchecks_chunks(3000, typed=False), sink)
+    pipeline.add_step('handle_missing_values', strategy='median').add_step('flag_outliers', column='returned_handgun').run()
+    result = pd.read_csv(sink)
+    expected = in_memory(acquisition)
+    assert result['returned_handgun_outlier'].tolist() == expected['returned_handgun_outlier'].tolist()
+    pd.testing.assert_series_equal(result['permit'], expected['permit'], check_dtype=False)
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.data_acquisition import DataAcquisition
+from analysis.data_clean import DataCleaner
+from analysis.data_transform import DataTransformer
+from analysis.plan import CleaningPlan
+
+NICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'nics-firearm-background-checks.csv')
+
+
+@pytest.fixture(scope='module')
+def nics():
+    data = DataAcquisition(None, NICS_PATH).load_nics_bgchecks_data(typed=False)
+    # Repeat some rows so remove_duplicates has work to do.
+    return pd.concat([data, data.iloc[::50]], ignore_index=True)
+
+
+def eager(data, hash_keys):
+    data = data.copy()
+    data = DataCleaner(data).remove_duplicates(hash_keys=hash_keys)
+    data = DataCleaner(data).handle_missing_values('drop', specific_column='handgun')
+    data = DataCleaner(data).handle_missing_values('median', specific_column='permit')
+    data = DataCleaner(data).handle_missing_values('custom', specific_column='admin', custom_fill_value=0)
+    data['returned_handgun_outlier'] = DataCleaner(data).outlier_flags('returned_handgun')
+    return DataTransformer(data).extract_date_components('month', drop_original=False, date_format='%Y-%m')
+
+
+@pytest.mark.parametrize('hash_keys', [False, True])
+def test_fused_plan_matches_eager_chain(nics, hash_keys):
+    before = nics.copy()
+    plan = (CleaningPlan(nics)
+            .remove_duplicates(hash_keys=hash_keys)
+            .handle_missing_values('drop', specific_column='handgun')
+            .handle_missing_values('median', specific_column='permit')
+            .handle_missing_values('custom', specific_column='admin', custom_fill_value=0)
+            .flag_outliers('returned_handgun')
+            .extract_date_components('month', drop_original=False, date_format='%Y-%m'))
+    assert [kind for kind, _ in plan.stages()] == ['filter', 'fill', 'call', 'call']
+
+    result = plan.execute()
+    pd.testing.assert_frame_equal(result, eager(nics, hash_keys))
+    pd.testing.assert_frame_equal(nics, before)
+
+
+def test_plan_steps_leave_input_unchanged(nics):
+    before = nics.copy()
+    plan = CleaningPlan(nics).handle_missing_values('mean').standardize_categorical('state').convert_data_types('permit', 'float32')
+    result = plan.execute()
+    pd.testing.assert_frame_equal(nics, before)
+    expected = DataCleaner(nics.copy()).handle_missing_values('mean')
+    expected = DataCleaner(DataCleaner(expected).standardize_categorical('state')).convert_data_types('permit', 'float32')
+    pd.testing.assert_frame_equal(result, expected)
+    assert result['permit'].dtype == np.float32 and result['permit'].notna().all()
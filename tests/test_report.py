@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.exploratory import ExploratoryDataAnalysisNICS
+from analysis.report import PlotSpec, render_report
+
+
+def nics_frame():
+    rng = np.random.default_rng(0)
+    count = 240
+    return pd.DataFrame({
+        'date_year': np.repeat(np.arange(2000, 2010), 24),
+        'date_month': np.tile(np.repeat(np.arange(1, 13), 2), 10),
+        'state': pd.Categorical(np.tile(['Ohio', 'Texas'], count // 2)),
+        'handgun': rng.integers(0, 1000, count),
+        'long_gun': rng.integers(0, 1000, count),
+        'totals': rng.integers(0, 5000, count).astype(float),
+    })
+
+
+def test_render_report_writes_every_format_and_times_every_spec(tmp_path):
+    specs = [PlotSpec('heatmap_for_year_and_state', 'handgun', name='heatmap'),
+             PlotSpec('monthly_sum_comparison', ['handgun', 'long_gun']),
+             PlotSpec('boxplot_by_state', 'totals', name='boxplot')]
+    output_dir = str(tmp_path / 'report')
+    timings = render_report(nics_frame(), specs, output_dir, ExploratoryDataAnalysisNICS,
+                            formats=('png', 'svg'), processes=1)
+
+    assert sorted(timings['name']) == sorted(spec.name for spec in specs)
+    assert (timings['total_seconds'] >= 0).all()
+    for spec in specs:
+        for extension in ('png', 'svg'):
+            path = os.path.join(output_dir, f'{spec.name}.{extension}')
+            assert os.path.getsize(path) > 0
+            assert path in timings.loc[timings['name'] == spec.name, 'files'].iloc[0]
+
+
+def test_missing_method_fails_before_rendering(tmp_path):
+    specs = [PlotSpec('heatmap_for_year_and_state', 'handgun'), PlotSpec('plot_nonexistent', 'handgun')]
+    with pytest.raises(ValueError, match='plot_nonexistent'):
+        render_report(nics_frame(), specs, str(tmp_path / 'report'), ExploratoryDataAnalysisNICS, processes=2)
+    assert not os.path.exists(tmp_path / 'report')
+
+
+def test_figure_level_methods_are_rejected():
+    with pytest.raises(ValueError, match='figure-level'):
+        PlotSpec('pairplot_relationships', ['handgun', 'totals'])
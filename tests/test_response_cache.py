@@ -0,0 +1,27 @@
+import datetime
+
+from analysis.gvascrape import ResponseCache
+
+URL = 'https://www.gunviolencearchive.org/query/abc?page=1&year={year}'
+
+
+def test_past_year_pages_settle_only_after_the_year_ended(tmp_path):
+    cache = ResponseCache(str(tmp_path), current_year_ttl=3600, past_year_grace=86400)
+    year = datetime.date.today().year - 1
+    end_of_year = datetime.datetime(year + 1, 1, 1).timestamp()
+    url = URL.format(year=year)
+
+    # Fetched in December of that year: the page was still changing, so it expires like a current page.
+    assert cache.ttl_for(url, {'fetched_at': end_of_year - 10 * 86400}) == 3600
+    # Fetched within the grace period after the year ended: still revalidated.
+    assert cache.ttl_for(url, {'fetched_at': end_of_year + 3600}) == 3600
+    # Fetched after the grace period: the page no longer changes.
+    assert cache.ttl_for(url, {'fetched_at': end_of_year + 2 * 86400}) is None
+    assert not cache.is_fresh(url, {'fetched_at': end_of_year - 86400})
+
+
+def test_current_year_and_overrides(tmp_path):
+    year = datetime.date.today().year
+    cache = ResponseCache(str(tmp_path), ttl_by_year={year - 5: 60}, current_year_ttl=0)
+    assert cache.ttl_for(URL.format(year=year), {'fetched_at': 0}) == 0
+    assert cache.ttl_for(URL.format(year=year - 5), {'fetched_at': 0}) == 60
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.data_clean import DataCleaner
+from analysis.sketches import ColumnSketches, KLLSketch
+
+PERCENTILES = np.arange(1, 100) / 100
+
+
+def rank_errors(sketch, sorted_values):
+    estimates = sketch.quantile(PERCENTILES)
+    lower = np.searchsorted(sorted_values, estimates, side='left') / len(sorted_values)
+    upper = np.searchsorted(sorted_values, estimates, side='right') / len(sorted_values)
+    # Distance from q to the range of ranks the estimate occupies (ties make it a range).
+    return np.maximum(0, np.maximum(lower - PERCENTILES, PERCENTILES - upper))
+
+
+def test_exact_below_k():
+    values = np.random.default_rng(0).normal(size=150)
+    sketch = KLLSketch(k=200, seed=0).update(values[:100]).update(np.append(values[100:], np.nan))
+    assert sketch.count == 150
+    np.testing.assert_allclose(sketch.quantile(PERCENTILES), np.quantile(values, PERCENTILES))
+    assert np.isnan(KLLSketch().quantile(0.5))
+
+
+@pytest.fixture(scope='module')
+def stream():
+    rng = np.random.default_rng(42)
+    return np.concatenate([rng.normal(100, 15, 500000), rng.lognormal(3, 1, 500000)])[rng.permutation(1000000)]
+
+
+def test_rank_error_bound_on_a_million_values(stream):
+    sketch = KLLSketch(k=200, seed=1)
+    for chunk in np.array_split(stream, 100):
+        sketch.update(chunk)
+    assert sketch.count == len(stream)
+    assert sum(len(level) for level in sketch.levels) < 3 * 200 + 2 * len(sketch.levels)
+    # Documented for k=200: under 1.6% over all 99 percentiles.
+    assert rank_errors(sketch, np.sort(stream)).max() < 0.016
+
+
+def test_merged_partition_sketches_match_a_single_pass(stream):
+    sorted_values = np.sort(stream)
+    single = KLLSketch(k=200, seed=1).update(stream)
+    merged = KLLSketch(k=200, seed=1)
+    for seed, partition in enumerate(np.array_split(stream, 20)):
+        merged.merge(KLLSketch(k=200, seed=seed).update(partition))
+    assert merged.count == single.count == len(stream)
+    assert rank_errors(merged, sorted_values).max() < 0.016
+    # Both land within the bound of the true percentile, so within twice the bound of each other.
+    ranks = [np.searchsorted(sorted_values, sketch.quantile(PERCENTILES)) / len(stream) for sketch in (merged, single)]
+    assert np.abs(ranks[0] - ranks[1]).max() < 0.032
+
+    frame = pd.DataFrame({'x': stream})
+    parts = [ColumnSketches(['x'], seed=seed).update(part) for seed, part in enumerate(frame.iloc[i::4] for i in range(4))]
+    combined = parts[0]
+    for part in parts[1:]:
+        combined.merge(part)
+    assert combined.counts['x'] == len(stream)
+    assert combined.mean('x') == pytest.approx(stream.mean())
+
+
+def test_numeric_statistics_matches_describe():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'handgun': pd.array(rng.poisson(50, 1000), dtype='UInt32'),
+        'totals': rng.normal(1000, 100, 1000),
+        'state': rng.choice(['Ohio', 'Utah'], 1000),
+    })
+    df.loc[::9, 'totals'] = np.nan
+    df.loc[::11, 'handgun'] = pd.NA
+    cleaner = DataCleaner(df)
+    result = cleaner.numeric_statistics()
+    expected = df.describe().T[['count', 'mean', '25%', '50%', '75%']].astype(float)
+    expected.columns = ['count', 'mean', 0.25, 0.5, 0.75]
+    pd.testing.assert_frame_equal(result.loc[expected.index], expected, check_names=False, check_index_type=False)
+
+    approximate = cleaner.numeric_statistics(approximate=True)
+    assert approximate.loc['totals', 'mean'] == pytest.approx(expected.loc['totals', 'mean'])
+    assert approximate.loc['handgun', 'count'] == expected.loc['handgun', 'count']
+
+
+def test_outlier_mask_matches_check_for_outliers():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'totals': np.append(rng.normal(0, 1, 500), [15.0, -12.0, np.nan]),
+                       'handgun': np.append(rng.poisson(5, 500), [5, 80, 5]).astype(float)})
+    cleaner = DataCleaner(df)
+    mask = cleaner.outlier_mask()
+    for column in df.columns:
+        assert mask.index[mask[column]].equals(cleaner.check_for_outliers(column).index)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from analysis.exploratory import describe_columns, normality_tests
+
+
+def make_frame(rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'state': rng.choice(['Ohio', 'Texas', 'Utah'], rows),
+        'normal': rng.normal(10, 3, rows),
+        'counts': pd.array(rng.poisson(4, rows), dtype='UInt16'),
+        'skewed': rng.exponential(2, rows).round(1),
+    })
+    df.loc[rng.random(rows) < 0.1, 'normal'] = np.nan
+    df.loc[rng.random(rows) < 0.2, 'counts'] = pd.NA
+    df.loc[df.index[:5], 'state'] = None
+    return df
+
+
+def expected_statistics(values, ddof):
+    values = pd.Series(values, dtype=float).dropna()
+    return {
+        'count': len(values), 'mean': values.mean(), 'median': values.median(), 'mode': values.mode().min(),
+        'std': values.std(ddof=ddof), 'var': values.var(ddof=ddof),
+        'skew': stats.skew(values, bias=True), 'kurtosis': stats.kurtosis(values, bias=True),
+    }
+
+
+@pytest.mark.parametrize('ddof', [0, 1])
+def test_describe_columns_matches_pandas_and_scipy(ddof):
+    df = make_frame()
+    columns = ['normal', 'counts', 'skewed']
+    result = describe_columns(df, columns, ddof=ddof)
+    for column in columns:
+        expected = expected_statistics(df[column], ddof)
+        assert result.loc[column].to_dict() == pytest.approx(expected)
+
+    grouped = describe_columns(df, columns, by='state', ddof=ddof)
+    assert sorted(grouped.index.get_level_values('state').unique()) == ['Ohio', 'Texas', 'Utah']
+    for (state, column), row in grouped.iterrows():
+        expected = expected_statistics(df.loc[df['state'] == state, column], ddof)
+        assert row.to_dict() == pytest.approx(expected)
+
+
+def test_describe_columns_edge_cases():
+    empty = describe_columns(make_frame().iloc[:0], ['normal', 'counts'])
+    assert empty['count'].tolist() == [0, 0] and empty.drop(columns='count').isna().all().all()
+    assert describe_columns(make_frame().iloc[:0], ['normal'], by='state').empty
+
+    constant = describe_columns(pd.DataFrame({'x': [2.0, 2.0, np.nan]}))
+    assert constant.loc['x', ['count', 'mean', 'median', 'mode', 'std']].tolist() == [2, 2.0, 2.0, 2.0, 0.0]
+    assert np.isnan(constant.loc['x', 'skew'])
+
+
+def test_normality_tests_match_scipy():
+    df = make_frame()
+    result = normality_tests(df, ['normal', 'skewed'], by='state', max_shapiro=150)
+    for (state, column), row in result.iterrows():
+        data = df.loc[df['state'] == state, column].dropna().to_numpy()
+        test = stats.normaltest if len(data) > 150 else stats.shapiro
+        statistic, p_value = test(data)
+        assert row['test'] == test.__name__ and row['n'] == len(data)
+        assert (row['statistic'], row['p_value']) == pytest.approx((statistic, p_value))
+        assert row['normal_rejected'] == (p_value < 0.05)
+
+    subsampled = normality_tests(df, ['skewed'], max_shapiro=100, large_test='subsample')
+    assert subsampled.loc['skewed', 'test'] == 'shapiro' and subsampled.loc['skewed', 'n'] == 100
+
+
+def test_normality_tests_small_and_empty_samples():
+    result = normality_tests(pd.DataFrame({'x': [1.0, 2.0, np.nan], 'y': [3.0, 3.0, 3.0]}))
+    assert result['test'].isna().all() and result['p_value'].isna().all()
+    assert result['n'].tolist() == [2, 3]
+    assert normality_tests(make_frame().iloc[:0], ['normal'], by='state').empty